@@ -41,6 +41,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # First, so its timings cover the rest of the stack
+    'LibraryProject.metrics.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -54,7 +56,8 @@ ROOT_URLCONF = 'LibraryProject.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # Django's template backend, recording render times for LibraryProject.metrics
+        'BACKEND': 'LibraryProject.metrics.DjangoTemplates',
         'DIRS': [],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -68,6 +71,17 @@ TEMPLATES = [
     },
 ]
 
+# Per-view request metrics (LibraryProject.metrics), served at /metrics/ to staff
+# users and to scrapers sending "Authorization: Bearer <TOKEN>" (an empty TOKEN
+# disables token access); Server-Timing headers show them per response.
+# ALLOWED_IPS grants access by REMOTE_ADDR. Leave it empty behind a reverse
+# proxy, where every request arrives from the proxy's address (e.g. 127.0.0.1)
+REQUEST_METRICS = {
+    'SERVER_TIMING': True,
+    'TOKEN': '',
+    'ALLOWED_IPS': (),
+}
+
 WSGI_APPLICATION = 'LibraryProject.wsgi.application'
 
 
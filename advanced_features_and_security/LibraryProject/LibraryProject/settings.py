@@ -45,6 +45,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # First, so its timings cover the rest of the stack
+    'LibraryProject.metrics.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -58,7 +60,8 @@ ROOT_URLCONF = 'LibraryProject.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # Django's template backend, recording render times for LibraryProject.metrics
+        'BACKEND': 'LibraryProject.metrics.DjangoTemplates',
         'DIRS': [],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -72,6 +75,17 @@ TEMPLATES = [
     },
 ]
 
+# Per-view request metrics (LibraryProject.metrics), served at /metrics/ to staff
+# users and to scrapers sending "Authorization: Bearer <TOKEN>" (an empty TOKEN
+# disables token access); Server-Timing headers show them per response.
+# ALLOWED_IPS grants access by REMOTE_ADDR. Leave it empty behind a reverse
+# proxy, where every request arrives from the proxy's address (e.g. 127.0.0.1)
+REQUEST_METRICS = {
+    'SERVER_TIMING': True,
+    'TOKEN': '',
+    'ALLOWED_IPS': (),
+}
+
 WSGI_APPLICATION = 'LibraryProject.wsgi.application'
 
 
@@ -86,6 +100,54 @@ DATABASES = {
 }
 
 
+# Caches
+# Local memory is per process; use a shared backend such as Memcached or
+# Redis in production so invalidations reach every worker.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'library-default',
+        'OPTIONS': {
+            'MAX_ENTRIES': 10000,
+        },
+    },
+}
+
+# Cached book_list/book_detail fragments and Book objects (bookshelf.caching)
+BOOK_CACHE = {
+    'ALIAS': 'default',
+    'TIMEOUT': 600,  # seconds
+}
+
+# Admin changelists for large tables (bookshelf.adminperf): estimated or
+# cached counts, capped filtered counts and cached list_filter choices
+ADMIN_PERFORMANCE = {
+    'ENABLED': True,
+    'ALIAS': 'default',
+    'TIMEOUT': 600,  # seconds
+    'ESTIMATE_THRESHOLD': 100000,  # rows
+    'COUNT_LIMIT': 10000,
+    'FILTER_CHOICES': 50,
+}
+
+
+# Authentication backends
+# Loads UserProfile together with request.user so role checks cost no query,
+# and serves permission checks from the shared permission cache below
+
+AUTHENTICATION_BACKENDS = [
+    'bookshelf.backends.CachedPermissionBackend',
+]
+
+# Per-user permission sets cached by bookshelf.permcache. Point ALIAS at a
+# cache shared by all worker processes (e.g. Memcached or Redis) in production.
+PERMISSION_CACHE = {
+    'ALIAS': 'default',
+    'TIMEOUT': 300,  # seconds
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
@@ -266,6 +328,30 @@ LOGGING = {
     },
 }
 
+# Rate Limiting
+# Token-bucket limits applied with bookshelf.ratelimit.rate_limit, as 'N/period'
+RATE_LIMITS = {
+    'book_search': '30/m',
+    # Typeahead sends a request per keystroke
+    'book_autocomplete': '300/m',
+}
+
+# Counter store for rate limits. Use 'bookshelf.ratelimit.CacheBucketStore'
+# (OPTIONS: {'alias': ...}) for a Django cache, or 'bookshelf.ratelimit.FileBucketStore'
+# (OPTIONS: {'directory': ...}) to share counters between worker processes.
+RATE_LIMIT_STORE = {
+    'BACKEND': 'bookshelf.ratelimit.MemoryBucketStore',
+    'OPTIONS': {},
+}
+
+# Typeahead suggestions from bookshelf.autocomplete. Each worker process keeps
+# its own index and reloads it from the database after MAX_AGE seconds.
+AUTOCOMPLETE = {
+    'MAX_AGE': 300,  # seconds
+    'LIMIT': 10,
+    'MIN_LENGTH': 1,
+}
+
 # Database Security
 # For production, use environment variables for database credentials
 # Never commit database credentials to version control
@@ -284,5 +370,5 @@ LOGGING = {
 # 6. Implement proper authentication and authorization
 # 7. Use CSRF tokens in all forms
 # 8. Sanitize user inputs to prevent XSS attacks
-# 9. Implement rate limiting for API endpoints
+# 9. Rate limiting is configured in RATE_LIMITS above
 # 10. Regular security audits and penetration testing
@@ -2,10 +2,14 @@ from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
 from django.contrib.auth.models import Group, Permission
 from django.contrib.contenttypes.models import ContentType
+from django.db.models.functions import Lower
+from . import caching, search
+from .adminperf import CachedValuesListFilter, PerformanceModeMixin, get_config, model_version, prefix_range
+from .forms import BookForm
 from .models import CustomUser, Book
 
 # Custom User Admin Configuration
-class CustomUserAdmin(UserAdmin):
+class CustomUserAdmin(PerformanceModeMixin, UserAdmin):
     """
     Custom admin interface for CustomUser model.
     Extends Django's UserAdmin to handle additional fields.
@@ -41,7 +45,32 @@ class CustomUserAdmin(UserAdmin):
     # Ordering of users in the list view
     ordering = ('username',)
 
-class BookAdmin(admin.ModelAdmin):
+    @property
+    def search_help_text(self):
+        if get_config()['ENABLED']:
+            return (
+                'Matches the start of a username or email address, in any case. '
+                'Search for two or more words to also match names.'
+            )
+        return None
+
+    def cache_version(self):
+        """Cached user counts last until a user is added or deleted."""
+        return model_version(self.model)
+
+    def get_search_results(self, request, queryset, search_term):
+        """
+        In performance mode, match single-word terms against the start of the
+        username or email, in any case, with range scans of their LOWER()
+        indexes. Terms of several words get the full search.
+        """
+        term = search_term.strip().lower()
+        if not term or ' ' in term or not get_config()['ENABLED']:
+            return super().get_search_results(request, queryset, search_term)
+        queryset = queryset.alias(username_lower=Lower('username'), email_lower=Lower('email'))
+        return queryset.filter(prefix_range('username_lower', term) | prefix_range('email_lower', term)), False
+
+class BookAdmin(PerformanceModeMixin, admin.ModelAdmin):
     """
     Enhanced admin interface for Book model with permission-based features.
     """
@@ -49,13 +78,26 @@ class BookAdmin(admin.ModelAdmin):
     list_display = ('title', 'author', 'publication_year')
     
     # Add filters for these fields in the admin sidebar
-    list_filter = ('author', 'publication_year')
+    list_filter = (('author', CachedValuesListFilter), ('publication_year', CachedValuesListFilter))
     
     # Enable search functionality for these fields
     search_fields = ('title', 'author')
     
     # Optional: Add ordering
     ordering = ('title',)
+
+    # Validate admin edits with the same rules as the book views and bulk import
+    form = BookForm
+
+    def cache_version(self):
+        """Cached counts and filter choices last until the next book change."""
+        return caching.books_version()
+
+    def get_search_results(self, request, queryset, search_term):
+        """In performance mode, search titles and authors through the full-text index."""
+        if not (search_term.strip() and get_config()['ENABLED']):
+            return super().get_search_results(request, queryset, search_term)
+        return search.filter_books(queryset, search_term), False
     
     # Define which permissions are required for different actions
     def has_view_permission(self, request, obj=None):
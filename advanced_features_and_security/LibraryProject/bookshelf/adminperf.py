@@ -0,0 +1,182 @@
+"""
+Admin changelist performance mode for large tables.
+
+When ADMIN_PERFORMANCE['ENABLED'] is set, ModelAdmins that use
+PerformanceModeMixin:
+
+* count an unfiltered changelist from the database's table statistics
+  (pg_class.reltuples on PostgreSQL, sqlite_stat1 once ANALYZE has run on
+  SQLite) when those put the table above ESTIMATE_THRESHOLD rows. Smaller
+  or unanalysed tables are counted exactly, and the count is cached;
+* stop counting filtered or searched changelists after COUNT_LIMIT rows,
+  so pagination never goes past COUNT_LIMIT results;
+* skip the extra "N total" count (show_full_result_count);
+* take CachedValuesListFilter choices from the cache: the FILTER_CHOICES
+  most common values, recomputed every TIMEOUT seconds instead of a
+  SELECT DISTINCT over the whole table on every page load.
+
+Each ModelAdmin keeps its own indexed search; see get_search_results in
+bookshelf.admin.
+"""
+from django.conf import settings
+from django.contrib import admin
+from django.core.cache import caches
+from django.core.paginator import Paginator
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+from django.db.models import Count, Q
+from django.utils.functional import cached_property
+
+# Above any character a search term can contain, for prefix range scans
+MAX_CHAR = '\U0010ffff'
+
+
+def get_config():
+    config = {
+        'ENABLED': False,
+        'ALIAS': 'default',
+        'TIMEOUT': 600,
+        'ESTIMATE_THRESHOLD': 100000,
+        'COUNT_LIMIT': 10000,
+        'FILTER_CHOICES': 50,
+    }
+    config.update(getattr(settings, 'ADMIN_PERFORMANCE', {}))
+    return config
+
+
+def get_cache():
+    return caches[get_config()['ALIAS']]
+
+
+def model_version(model):
+    """A counter for `model` in the admin cache, for ModelAdmin.cache_version()."""
+    cache = get_cache()
+    key = f'bookshelf:admin:version:{model._meta.label_lower}'
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, 1, None)
+        version = cache.get(key, 1)
+    return version
+
+
+def bump_model_version(model):
+    """Retire the cached counts and choices of every ModelAdmin keyed on model_version()."""
+    cache = get_cache()
+    key = f'bookshelf:admin:version:{model._meta.label_lower}'
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, model_version(model) + 1, None)
+
+
+def table_estimate(model, using=DEFAULT_DB_ALIAS):
+    """The planner's row count for `model`'s table, or None when there is none."""
+    connection = connections[using]
+    table = model._meta.db_table
+    try:
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                cursor.execute('SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass', [table])
+                row = cursor.fetchone()
+                # -1 until the table has been vacuumed or analysed
+                return row[0] if row and row[0] >= 0 else None
+            if connection.vendor == 'sqlite':
+                cursor.execute('SELECT stat FROM sqlite_stat1 WHERE tbl = %s LIMIT 1', [table])
+                row = cursor.fetchone()
+                return int(row[0].split()[0]) if row else None
+    except DatabaseError:
+        # No sqlite_stat1 table before the first ANALYZE
+        return None
+    return None
+
+
+def table_count(model, using=DEFAULT_DB_ALIAS, version=''):
+    """
+    Rows in `model`'s table: the estimate for large tables, otherwise an
+    exact count cached for TIMEOUT seconds (and per `version`, for models
+    that track one).
+    """
+    config = get_config()
+    estimate = table_estimate(model, using)
+    if estimate is not None and estimate >= config['ESTIMATE_THRESHOLD']:
+        return estimate
+    cache = get_cache()
+    key = f'bookshelf:admin:count:{model._meta.label_lower}:{using}:{version}'
+    count = cache.get(key)
+    if count is None:
+        count = model._default_manager.using(using).count()
+        cache.set(key, count, config['TIMEOUT'])
+    return count
+
+
+def prefix_range(field_name, term):
+    """Q for values starting with `term`, as a range an index on the field can serve."""
+    return Q(**{f'{field_name}__gte': term, f'{field_name}__lt': term + MAX_CHAR})
+
+
+class CountingPaginator(Paginator):
+    """Paginator whose count comes from `count_function(object_list)`."""
+
+    def __init__(self, object_list, per_page, count_function, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.count_function = count_function
+
+    @cached_property
+    def count(self):
+        return self.count_function(self.object_list)
+
+
+class CachedValuesListFilter(admin.AllValuesFieldListFilter):
+    """
+    AllValuesFieldListFilter offering the FILTER_CHOICES most common values,
+    cached, in performance mode. Other values can still be filtered on
+    through the URL.
+    """
+
+    def __init__(self, field, request, params, model, model_admin, field_path):
+        super().__init__(field, request, params, model, model_admin, field_path)
+        if get_config()['ENABLED'] and isinstance(model_admin, PerformanceModeMixin):
+            self.lookup_choices = model_admin.filter_choices(request, field.name)
+
+
+class PerformanceModeMixin:
+    """ModelAdmin changelist counting and filter choices for large tables."""
+
+    def cache_version(self):
+        """Part of every cache key; change it to retire cached counts and choices."""
+        return ''
+
+    @property
+    def show_full_result_count(self):
+        return not get_config()['ENABLED']
+
+    def get_paginator(self, request, queryset, per_page, orphans=0, allow_empty_first_page=True):
+        if not get_config()['ENABLED']:
+            return super().get_paginator(request, queryset, per_page, orphans, allow_empty_first_page)
+        return CountingPaginator(
+            queryset, per_page, self.count_results, orphans=orphans, allow_empty_first_page=allow_empty_first_page
+        )
+
+    def count_results(self, queryset):
+        if not queryset.query.where:
+            return table_count(self.model, queryset.db, self.cache_version())
+        # Filtered or searched: count no further than COUNT_LIMIT
+        return queryset.order_by()[:get_config()['COUNT_LIMIT']].count()
+
+    def filter_choices(self, request, field_name):
+        """The FILTER_CHOICES most common values of `field_name`, sorted, from the cache."""
+        config = get_config()
+        cache = get_cache()
+        key = f'bookshelf:admin:choices:{self.model._meta.label_lower}:{field_name}:{self.cache_version()}'
+        choices = cache.get(key)
+        if choices is None:
+            rows = (
+                self.get_queryset(request).order_by().values_list(field_name)
+                .annotate(occurrences=Count('pk')).order_by('-occurrences')[:config['FILTER_CHOICES']]
+            )
+            values = [value for value, _ in rows]
+            choices = sorted(value for value in values if value is not None)
+            if len(choices) < len(values):
+                # AllValuesFieldListFilter offers None as the "empty" choice
+                choices.append(None)
+            cache.set(key, choices, config['TIMEOUT'])
+        return choices
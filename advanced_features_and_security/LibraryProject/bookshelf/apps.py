@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class BookshelfConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'bookshelf'
+
+    def ready(self):
+        # Keep the shared permission cache in step with group/permission changes
+        from . import signals  # noqa: F401
@@ -0,0 +1,168 @@
+"""
+In-memory prefix index for book title and author typeahead.
+
+Titles and author names are kept in sorted arrays of case-folded keys, so
+the suggestions for a prefix are a bisect to the first match followed by a
+short forward scan; no database query is made once the index is loaded.
+The index is loaded from the database on first use and then follows Book
+post_save/post_delete signals in this process. Other worker processes only
+see those changes once their copy is older than AUTOCOMPLETE['MAX_AGE']
+seconds and is reloaded.
+"""
+import sys
+import threading
+import time
+from array import array
+from bisect import bisect_left
+
+from django.conf import settings
+
+from .models import Book
+
+
+def normalize(text):
+    return ' '.join(text.split()).casefold()
+
+
+class SortedPrefixIndex:
+    """
+    Sorted (key, value, id) entries held in three parallel arrays. Keys
+    are normalized strings; the original value is only stored separately
+    when it differs from its key. Not thread-safe on its own.
+    """
+
+    def __init__(self, intern_values=False):
+        self.keys = []
+        self.values = []
+        self.ids = array('q')
+        # Share one string object per distinct value (e.g. authors of many books)
+        self.intern = sys.intern if intern_values else str
+
+    def __len__(self):
+        return len(self.keys)
+
+    @classmethod
+    def from_entries(cls, entries, intern_values=False):
+        """Build from (value, id) pairs in one sort instead of repeated inserts."""
+        index = cls(intern_values)
+        rows = sorted(((index.intern(normalize(value)), index.intern(value), pk) for value, pk in entries))
+        index.keys = [key for key, _, _ in rows]
+        index.values = [value if value != key else key for key, value, _ in rows]
+        index.ids = array('q', (pk for _, _, pk in rows))
+        return index
+
+    def add(self, value, pk):
+        key, value = self.intern(normalize(value)), self.intern(value)
+        position = bisect_left(self.keys, key)
+        # Keep entries with equal keys ordered by id
+        while position < len(self.keys) and self.keys[position] == key and self.ids[position] < pk:
+            position += 1
+        self.keys.insert(position, key)
+        self.values.insert(position, value if value != key else key)
+        self.ids.insert(position, pk)
+
+    def remove(self, value, pk):
+        key = normalize(value)
+        position = bisect_left(self.keys, key)
+        while position < len(self.keys) and self.keys[position] == key:
+            if self.ids[position] == pk:
+                del self.keys[position], self.values[position], self.ids[position]
+                return
+            position += 1
+
+    def search(self, prefix, limit, distinct=False):
+        """Up to `limit` (value, id) pairs whose key starts with `prefix`."""
+        prefix = normalize(prefix)
+        results, seen = [], set()
+        position = bisect_left(self.keys, prefix)
+        while position < len(self.keys) and len(results) < limit:
+            key = self.keys[position]
+            if not key.startswith(prefix):
+                break
+            if not distinct or key not in seen:
+                seen.add(key)
+                results.append((self.values[position], self.ids[position]))
+            position += 1
+        return results
+
+
+class BookAutocomplete:
+    """Title and author prefix indexes for all books, plus each book's indexed values."""
+
+    def __init__(self, books=()):
+        books = list(books)
+        self.titles = SortedPrefixIndex.from_entries((title, pk) for pk, title, _ in books)
+        self.authors = SortedPrefixIndex.from_entries(
+            ((author, pk) for pk, _, author in books), intern_values=True
+        )
+        # pk -> (title, author), needed to remove the old entries on change
+        self.books = {pk: (title, author) for pk, title, author in books}
+        self.loaded_at = time.monotonic()
+
+    @classmethod
+    def load(cls):
+        return cls(Book.objects.values_list('pk', 'title', 'author').iterator(chunk_size=10000))
+
+    def update(self, pk, title, author):
+        self.remove(pk)
+        self.titles.add(title, pk)
+        self.authors.add(author, pk)
+        self.books[pk] = (title, author)
+
+    def remove(self, pk):
+        old = self.books.pop(pk, None)
+        if old is not None:
+            self.titles.remove(old[0], pk)
+            self.authors.remove(old[1], pk)
+
+    def suggest(self, prefix, limit):
+        return {
+            'titles': [{'id': pk, 'title': title} for title, pk in self.titles.search(prefix, limit)],
+            # One suggestion per author, however many books they wrote
+            'authors': [author for author, _ in self.authors.search(prefix, limit, distinct=True)],
+        }
+
+
+def get_config():
+    config = {'MAX_AGE': 300, 'LIMIT': 10, 'MIN_LENGTH': 1}
+    config.update(getattr(settings, 'AUTOCOMPLETE', {}))
+    return config
+
+
+_index = None
+_lock = threading.RLock()
+
+
+def get_index():
+    """This process's BookAutocomplete, (re)loaded when missing or older than MAX_AGE."""
+    global _index
+    with _lock:
+        if _index is None or time.monotonic() - _index.loaded_at > get_config()['MAX_AGE']:
+            _index = BookAutocomplete.load()
+        return _index
+
+
+def suggest(prefix, limit=None):
+    limit = limit or get_config()['LIMIT']
+    index = get_index()
+    with _lock:
+        return index.suggest(prefix, limit)
+
+
+def book_saved(book):
+    with _lock:
+        if _index is not None:
+            _index.update(book.pk, book.title, book.author)
+
+
+def book_deleted(book_id):
+    with _lock:
+        if _index is not None:
+            _index.remove(book_id)
+
+
+def reset():
+    """Forget the loaded index; the next suggestion reloads it."""
+    global _index
+    with _lock:
+        _index = None
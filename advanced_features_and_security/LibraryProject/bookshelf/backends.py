@@ -0,0 +1,24 @@
+from relationship_app.backends import ProfileModelBackend
+
+from . import permcache
+
+
+class CachedPermissionBackend(ProfileModelBackend):
+    """
+    Authentication backend whose permission checks are served from
+    bookshelf.permcache, so has_perm() costs no queries once a user's
+    permissions have been computed by any request in any process sharing
+    the cache. Loading of UserProfile with the user is inherited from
+    ProfileModelBackend.
+    """
+
+    def get_all_permissions(self, user_obj, obj=None):
+        if not user_obj.is_active or user_obj.is_anonymous or obj is not None:
+            return set()
+        if not hasattr(user_obj, '_perm_cache'):
+            permissions = permcache.get_permissions(user_obj)
+            if permissions is None:
+                permissions = super().get_all_permissions(user_obj)
+                permcache.set_permissions(user_obj, permissions)
+            user_obj._perm_cache = set(permissions)
+        return user_obj._perm_cache
@@ -0,0 +1,158 @@
+"""
+Bulk import and export of books as CSV or JSON Lines.
+
+Imports read the uploaded file one row at a time (uploads above
+FILE_UPLOAD_MAX_MEMORY_SIZE are spooled to disk by Django, so the file is
+never held in memory), validate them a batch at a time with BookForm's
+field and clean_<field> rules (see bookshelf.validation), and insert the
+valid rows with bulk_create, one transaction per batch. Invalid rows are
+skipped and reported by line number.
+
+Exports stream rows straight from a database iterator.
+"""
+import csv
+import io
+import json
+from collections import namedtuple
+
+from django.db import transaction
+
+from . import autocomplete, caching, search, validation
+from .models import Book
+
+FIELDS = ('title', 'author', 'publication_year')
+
+# Rows per bulk_create / transaction
+BATCH_SIZE = 2000
+# Rows per database round trip while exporting
+EXPORT_CHUNK_SIZE = 2000
+# Errors listed in an import report; the rest are only counted
+MAX_REPORTED_ERRORS = 100
+
+ImportResult = namedtuple('ImportResult', 'rows created error_count errors aborted')
+RowError = namedtuple('RowError', 'line errors')
+
+
+class ImportFormatError(Exception):
+    """The uploaded file is not CSV or JSON Lines, or cannot be decoded."""
+
+
+def file_format(name):
+    lowered = name.lower()
+    if lowered.endswith('.csv'):
+        return 'csv'
+    if lowered.endswith(('.jsonl', '.ndjson')):
+        return 'jsonl'
+    raise ImportFormatError('Upload a .csv or .jsonl file.')
+
+
+def iter_rows(uploaded_file):
+    """
+    Yield (line number, dict) for every record of an uploaded CSV (with a
+    header row) or JSON Lines file, reading it incrementally. Raises
+    ImportFormatError on undecodable or malformed input.
+    """
+    fmt = file_format(uploaded_file.name)
+    uploaded_file.seek(0)
+    text = io.TextIOWrapper(uploaded_file.file, encoding='utf-8-sig', newline='')
+    try:
+        if fmt == 'csv':
+            reader = csv.DictReader(text)
+            for row in reader:
+                yield reader.line_num, row
+        else:
+            for line_number, line in enumerate(text, 1):
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                except ValueError:
+                    row = None
+                if not isinstance(row, dict):
+                    raise ImportFormatError(f'Line {line_number} is not a JSON object.')
+                yield line_number, row
+    except UnicodeDecodeError:
+        raise ImportFormatError('The file is not UTF-8 encoded.')
+    except csv.Error as exc:
+        raise ImportFormatError(f'Malformed CSV: {exc}')
+    finally:
+        # Leave the upload itself open for Django to clean up
+        text.detach()
+
+
+def import_books(uploaded_file, batch_size=BATCH_SIZE):
+    """
+    Import an uploaded file. Returns an ImportResult; `aborted` holds the
+    reason when the file turned out to be unreadable part way through, in
+    which case the rows read before that point are still imported.
+    """
+    validator = validation.BookValidator()
+    result = ImportResult(0, 0, 0, [], None)
+    pending = []
+
+    try:
+        for line_and_row in iter_rows(uploaded_file):
+            pending.append(line_and_row)
+            if len(pending) >= batch_size:
+                result = _load(validator, pending, result)
+                pending = []
+    except ImportFormatError as exc:
+        result = result._replace(aborted=str(exc))
+    if pending:
+        result = _load(validator, pending, result)
+
+    if result.created:
+        # bulk_create sends no signals; refresh what the Book signals maintain
+        transaction.on_commit(caching.bump_books_version)
+        transaction.on_commit(autocomplete.reset)
+    return result
+
+
+def _load(validator, pending, result):
+    """Validate one batch of (line, row) pairs and insert its valid rows."""
+    books = []
+    error_count = result.error_count
+    for (line, _), (data, row_errors) in zip(pending, validator.validate_rows(row for _, row in pending)):
+        if row_errors:
+            error_count += 1
+            if len(result.errors) < MAX_REPORTED_ERRORS:
+                result.errors.append(RowError(line, row_errors))
+        else:
+            books.append(Book(**data))
+    created = _insert(books) if books else 0
+    return result._replace(
+        rows=result.rows + len(pending), created=result.created + created, error_count=error_count
+    )
+
+
+def _insert(batch):
+    with transaction.atomic():
+        books = Book.objects.bulk_create(batch)
+        search.index_books(books)
+    return len(books)
+
+
+def export_books(fmt):
+    """Yield the whole books table as CSV or JSON Lines text chunks."""
+    rows = Book.objects.order_by('pk').values_list('pk', *FIELDS).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    if fmt == 'csv':
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(('id',) + FIELDS)
+        for count, row in enumerate(rows, 1):
+            writer.writerow(row)
+            if count % EXPORT_CHUNK_SIZE == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue()
+    else:
+        keys = ('id',) + FIELDS
+        chunk = []
+        for row in rows:
+            chunk.append(json.dumps(dict(zip(keys, row))))
+            if len(chunk) == EXPORT_CHUNK_SIZE:
+                yield '\n'.join(chunk) + '\n'
+                chunk = []
+        if chunk:
+            yield '\n'.join(chunk) + '\n'
@@ -0,0 +1,85 @@
+"""
+Cached rendering for the book_list and book_detail pages.
+
+Rendered fragments (the {% cache %} blocks in book_list.html and
+book_detail.html) and the Book objects behind book_detail are stored in
+the BOOK_CACHE['ALIAS'] cache. Their keys include:
+
+* the books version, bumped by the Book post_save/post_delete signals once
+  the change is committed, so any change to any book retires every entry;
+* the viewer's permission class, the bookshelf permissions that change
+  which buttons a page shows, so users only get fragments rendered for
+  the same set of permissions.
+
+Permission checks themselves still run on every request; see
+bookshelf.permcache for how they avoid queries.
+"""
+from django.conf import settings
+from django.core.cache import caches
+from django.http import Http404
+
+from .models import Book
+
+VERSION_KEY = 'bookshelf:books:version'
+
+# Permissions that change what the book pages render
+PAGE_PERMISSIONS = ('can_view', 'can_create', 'can_edit', 'can_delete')
+
+
+def get_config():
+    config = {'ALIAS': 'default', 'TIMEOUT': 600}
+    config.update(getattr(settings, 'BOOK_CACHE', {}))
+    return config
+
+
+def get_cache():
+    return caches[get_config()['ALIAS']]
+
+
+def books_version():
+    cache = get_cache()
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, 1, None)
+        version = cache.get(VERSION_KEY, 1)
+    return version
+
+
+def bump_books_version():
+    cache = get_cache()
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, books_version() + 1, None)
+
+
+def permission_class(user):
+    """The viewer's page permissions as a short string, e.g. 'v-e-'."""
+    return ''.join(
+        name[4] if user.has_perm(f'bookshelf.{name}') else '-' for name in PAGE_PERMISSIONS
+    )
+
+
+def page_context(request):
+    """Template context the {% cache %} blocks key their fragments on."""
+    config = get_config()
+    return {
+        'cache_alias': config['ALIAS'],
+        'cache_timeout': config['TIMEOUT'],
+        'books_version': books_version(),
+        'permission_class': permission_class(request.user),
+    }
+
+
+def get_book(pk):
+    """Book `pk` from the cache, falling back to the database. Raises Http404."""
+    cache = get_cache()
+    key = f'bookshelf:book:{books_version()}:{pk}'
+    book = cache.get(key)
+    if book is None:
+        try:
+            book = Book.objects.get(pk=pk)
+        except Book.DoesNotExist:
+            raise Http404('No Book matches the given query.')
+        cache.set(key, book, get_config()['TIMEOUT'])
+    return book
@@ -1,5 +1,6 @@
 from django import forms
 from django.core.exceptions import ValidationError
+from . import validation
 from .models import Book, CustomUser
 
 class BookForm(forms.ModelForm):
@@ -30,39 +31,40 @@ class BookForm(forms.ModelForm):
     
     def clean_title(self):
         """Validate and sanitize book title."""
-        title = self.cleaned_data.get('title')
-        if title:
-            title = title.strip()
-            if len(title) < 2:
-                raise ValidationError("Title must be at least 2 characters long.")
-            # Basic XSS prevention - remove potentially harmful characters
-            dangerous_chars = ['<', '>', '"', "'", '&']
-            for char in dangerous_chars:
-                if char in title:
-                    raise ValidationError("Title contains invalid characters.")
-        return title
+        # Basic XSS prevention - rejects potentially harmful characters
+        return validation.TITLE.clean(self.cleaned_data.get('title'))
     
     def clean_author(self):
         """Validate and sanitize author name."""
-        author = self.cleaned_data.get('author')
-        if author:
-            author = author.strip()
-            if len(author) < 2:
-                raise ValidationError("Author name must be at least 2 characters long.")
-            # Basic XSS prevention
-            dangerous_chars = ['<', '>', '"', "'", '&']
-            for char in dangerous_chars:
-                if char in author:
-                    raise ValidationError("Author name contains invalid characters.")
-        return author
+        return validation.AUTHOR.clean(self.cleaned_data.get('author'))
     
     def clean_publication_year(self):
         """Validate publication year."""
-        year = self.cleaned_data.get('publication_year')
-        if year:
-            if year < 1000 or year > 2024:
-                raise ValidationError("Publication year must be between 1000 and 2024.")
-        return year
+        return validation.clean_publication_year(self.cleaned_data.get('publication_year'))
+
+class BookImportForm(forms.Form):
+    """
+    Upload form for bulk book imports (CSV with a header row, or JSON Lines).
+    Rows are validated with BookForm's rules by bookshelf.bulk.
+    """
+    file = forms.FileField(
+        widget=forms.ClearableFileInput(attrs={
+            'class': 'form-control',
+            'accept': '.csv,.jsonl,.ndjson'
+        }),
+        help_text='CSV or JSON Lines with title, author and publication_year'
+    )
+
+    def clean_file(self):
+        """Only accept the supported file types."""
+        upload = self.cleaned_data.get('file')
+        if upload:
+            from .bulk import ImportFormatError, file_format
+            try:
+                file_format(upload.name)
+            except ImportFormatError as exc:
+                raise ValidationError(str(exc))
+        return upload
 
 class SecureSearchForm(forms.Form):
     """
@@ -80,17 +82,8 @@ class SecureSearchForm(forms.Form):
     
     def clean_query(self):
         """Sanitize and validate search query."""
-        query = self.cleaned_data.get('query')
-        if query:
-            query = query.strip()
-            # Remove potentially dangerous characters for XSS prevention
-            dangerous_chars = ['<', '>', '"', "'", '&', ';', '--']
-            for char in dangerous_chars:
-                query = query.replace(char, '')
-            # Limit length to prevent DoS attacks
-            if len(query) > 100:
-                query = query[:100]
-        return query
+        # Removes potentially dangerous characters and limits the length
+        return validation.clean_query(self.cleaned_data.get('query'))
 
 class CustomUserCreationForm(forms.ModelForm):
     """
@@ -171,29 +164,9 @@ class ExampleForm(forms.Form):
     
     def clean_name(self):
         """Validate and sanitize name field."""
-        name = self.cleaned_data.get('name')
-        if name:
-            name = name.strip()
-            if len(name) < 2:
-                raise ValidationError("Name must be at least 2 characters long.")
-            # Basic XSS prevention - remove potentially harmful characters
-            dangerous_chars = ['<', '>', '"', "'", '&', ';', '--']
-            for char in dangerous_chars:
-                if char in name:
-                    raise ValidationError("Name contains invalid characters.")
-        return name
+        return validation.NAME.clean(self.cleaned_data.get('name'))
     
     def clean_message(self):
         """Validate and sanitize message field."""
-        message = self.cleaned_data.get('message')
-        if message:
-            message = message.strip()
-            if len(message) < 10:
-                raise ValidationError("Message must be at least 10 characters long.")
-            # Basic XSS prevention
-            dangerous_chars = ['<script', '</script', 'javascript:', 'onclick=', 'onload=']
-            message_lower = message.lower()
-            for char in dangerous_chars:
-                if char in message_lower:
-                    raise ValidationError("Message contains potentially dangerous content.")
-        return message
+        # Basic XSS prevention
+        return validation.MESSAGE.clean(self.cleaned_data.get('message'))
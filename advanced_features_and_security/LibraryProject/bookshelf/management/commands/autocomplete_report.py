@@ -0,0 +1,64 @@
+import random
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand
+
+from bookshelf.autocomplete import BookAutocomplete
+
+SYLLABLES = 'ka lo mi ren tas vor el qui bran dol fen ith mar u sel tor ap zen'.split()
+SURNAMES = 'Smith Garcia Okafor Nakamura Rossi Novak Silva Kowalski Dubois Larsen'.split()
+
+
+class Command(BaseCommand):
+    """
+    Report the memory footprint, build time and lookup latency of the
+    typeahead index for a generated catalogue. Nothing is read from or
+    written to the database.
+    """
+    help = 'Measure bookshelf autocomplete index memory and latency'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--titles', type=int, default=1000000, help='Number of generated books')
+        parser.add_argument('--lookups', type=int, default=10000, help='Prefix lookups to time')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed')
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        words = sorted({''.join(rng.choices(SYLLABLES, k=rng.randint(2, 4))) for _ in range(20000)})
+        books = [
+            (
+                pk,
+                ' '.join(rng.sample(words, 4)).title(),
+                f'{rng.choice(words).title()} {rng.choice(SURNAMES)}',
+            )
+            for pk in range(1, options['titles'] + 1)
+        ]
+
+        start = time.perf_counter()
+        BookAutocomplete(books)
+        built = time.perf_counter() - start
+
+        # Built a second time under tracemalloc, which slows allocation down
+        tracemalloc.start()
+        index = BookAutocomplete(books)
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        prefixes = [
+            rng.choice(books)[rng.choice((1, 2))][:rng.randint(1, 8)] for _ in range(options['lookups'])
+        ]
+        latencies = []
+        for prefix in prefixes:
+            start = time.perf_counter()
+            index.suggest(prefix, 10)
+            latencies.append(time.perf_counter() - start)
+        latencies.sort()
+
+        self.stdout.write(f'Books indexed      {len(books):>12,}')
+        self.stdout.write(f'Build time         {built:>12.2f} s')
+        self.stdout.write(f'Index memory       {current / 2**20:>12.1f} MiB ({current / len(books):.0f} bytes/book)')
+        self.stdout.write(f'Peak while built   {peak / 2**20:>12.1f} MiB')
+        for pct in (50, 99):
+            value = latencies[min(len(latencies) - 1, len(latencies) * pct // 100)]
+            self.stdout.write(f'Lookup p{pct:<10} {value * 1e6:>12.1f} us')
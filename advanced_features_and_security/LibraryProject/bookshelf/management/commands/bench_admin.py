@@ -0,0 +1,85 @@
+import random
+import time
+
+from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test import RequestFactory, override_settings
+
+from bookshelf import search
+from bookshelf.models import Book
+
+SYLLABLES = 'ka lo mi ren tas vor el qui bran dol fen ith mar u sel tor ap zen'.split()
+SURNAMES = 'Smith Garcia Okafor Nakamura Rossi Novak Silva Kowalski Dubois Larsen'.split()
+
+PAGES = [
+    ('first page', {}),
+    ('page 50', {'p': '49'}),
+    ('search', {'q': 'kalo'}),
+    ('author filter', {'author': 'Smith Kalo'}),
+]
+
+
+class Command(BaseCommand):
+    """
+    Time the Book admin changelist with the performance mode on and off.
+
+    Books are seeded inside a transaction that is rolled back afterwards,
+    so the command can be run against a development database safely.
+    """
+    help = 'Benchmark the Book admin changelist at scale'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--books', type=int, default=1000000, help='Number of books to seed')
+        parser.add_argument('--repeat', type=int, default=3, help='Loads per page; the best is reported')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed')
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        words = sorted({''.join(rng.choices(SYLLABLES, k=rng.randint(2, 4))) for _ in range(20000)})
+        model_admin = admin.site._registry[Book]
+        factory = RequestFactory()
+
+        with transaction.atomic():
+            user = get_user_model().objects.create_superuser('bench-admin', 'bench@example.com', 'bench-pass-123')
+            start = time.perf_counter()
+            Book.objects.bulk_create(
+                (
+                    Book(
+                        title=' '.join(rng.sample(words, 4)).title(),
+                        author=f'{rng.choice(SURNAMES)} {rng.choice(words).title()}',
+                        publication_year=rng.randint(1900, 2024),
+                    )
+                    for _ in range(options['books'])
+                ),
+                batch_size=5000,
+            )
+            search.rebuild_index()
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE')
+            self.stdout.write(f'Seeded {options["books"]:,} books in {time.perf_counter() - start:.1f}s')
+
+            def load(params):
+                request = factory.get('/admin/bookshelf/book/', params)
+                request.user = user
+                model_admin.changelist_view(request).render()
+
+            self.stdout.write(f'{"page":<16}{"mode off":>12}{"mode on":>12}')
+            for label, params in PAGES:
+                timings = []
+                for enabled in (False, True):
+                    with override_settings(ADMIN_PERFORMANCE={'ENABLED': enabled}):
+                        cache.clear()
+                        # The first load fills the caches the mode relies on
+                        load(params)
+                        timings.append(min(self.time_once(load, params) for _ in range(options['repeat'])))
+                self.stdout.write(f'{label:<16}' + ''.join(f'{t * 1000:>10.1f}ms' for t in timings))
+            transaction.set_rollback(True)
+
+    @staticmethod
+    def time_once(func, params):
+        start = time.perf_counter()
+        func(params)
+        return time.perf_counter() - start
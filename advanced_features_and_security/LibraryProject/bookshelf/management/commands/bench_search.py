@@ -0,0 +1,82 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from bookshelf import search
+from bookshelf.models import Book
+
+# Words the benchmark queries look for, mixed into a large generated vocabulary
+WORDS = (
+    'django python web secure guide modern practical advanced patterns design '
+    'history ocean garden winter empire machine learning data systems network '
+    'night river silent stone golden journey kingdom letters shadow light'
+).split()
+SURNAMES = 'Smith Garcia Okafor Nakamura Rossi Novak Silva Kowalski Dubois Larsen'.split()
+
+SYLLABLES = 'ka lo mi ren tas vor el qui bran dol fen ith mar u sel tor ap zen'.split()
+
+QUERIES = ['django', 'secure python', 'gard', 'Okafor', 'golden river journey', 'zzz']
+
+
+class Command(BaseCommand):
+    """
+    Time book searches on a large catalogue: the former title icontains
+    scan, the bookshelf.search ORM fallback, and the FTS5 index.
+
+    Books are seeded inside a transaction that is rolled back afterwards,
+    so the command can be run against a development database safely.
+    """
+    help = 'Benchmark bookshelf full-text search against LIKE scans'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--books', type=int, default=1000000, help='Number of books to seed')
+        parser.add_argument('--repeat', type=int, default=5, help='Runs per query; the best is reported')
+        parser.add_argument('--vocabulary', type=int, default=20000, help='Generated words titles are drawn from')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed for generated titles')
+
+    def handle(self, *args, **options):
+        if not search.create_index():
+            raise CommandError('This database does not support FTS5')
+        rng = random.Random(options['seed'])
+        repeat = options['repeat']
+        vocabulary = WORDS + sorted({
+            ''.join(rng.choices(SYLLABLES, k=rng.randint(2, 4))) for _ in range(options['vocabulary'])
+        })
+
+        with transaction.atomic():
+            start = time.perf_counter()
+            Book.objects.bulk_create(
+                (
+                    Book(
+                        title=' '.join(rng.sample(vocabulary, 4)).title(),
+                        author=f'{rng.choice(SURNAMES)} {rng.choice(vocabulary).title()}',
+                        publication_year=rng.randint(1900, 2024),
+                    )
+                    for _ in range(options['books'])
+                ),
+                batch_size=5000,
+            )
+            seeded = time.perf_counter() - start
+            start = time.perf_counter()
+            search.rebuild_index()
+            indexed = time.perf_counter() - start
+            self.stdout.write(f'Seeded {options["books"]:,} books in {seeded:.1f}s, indexed in {indexed:.1f}s')
+
+            strategies = (
+                ('like', lambda q: list(Book.objects.filter(title__icontains=q).distinct()[:50])),
+                ('orm', lambda q: list(search._orm_queryset(search.terms(q), 'default')[:21])),
+                ('fts', lambda q: search.search_books(q).books),
+            )
+            self.stdout.write(f'{"query":<24}' + ''.join(f'{name:>12}' for name, _ in strategies))
+            for query in QUERIES:
+                timings = [min(self.time_once(func, query) for _ in range(repeat)) for _, func in strategies]
+                self.stdout.write(f'{query:<24}' + ''.join(f'{t * 1000:>10.2f}ms' for t in timings))
+            transaction.set_rollback(True)
+
+    @staticmethod
+    def time_once(func, query):
+        start = time.perf_counter()
+        func(query)
+        return time.perf_counter() - start
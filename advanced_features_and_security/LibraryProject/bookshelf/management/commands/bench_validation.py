@@ -0,0 +1,109 @@
+import random
+import time
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand
+
+from bookshelf import validation
+from bookshelf.forms import BookForm
+
+SYLLABLES = 'ka lo mi ren tas vor el qui bran dol fen ith mar u sel tor ap zen'.split()
+SURNAMES = 'Smith Garcia Okafor Nakamura Rossi Novak Silva Kowalski Dubois Larsen'.split()
+UNSAFE = ['<b>', '"', "'", '&', '>']
+
+
+def legacy_clean_text(value, label):
+    """The per-character loop clean_title/clean_author used before bookshelf.validation."""
+    if value:
+        value = value.strip()
+        if len(value) < 2:
+            raise ValidationError(f'{label} must be at least 2 characters long.')
+        for char in ['<', '>', '"', "'", '&']:
+            if char in value:
+                raise ValidationError(f'{label} contains invalid characters.')
+    return value
+
+
+def legacy_validate_row(fields, row):
+    """Form field clean() then the legacy clean_<field> loops, as bulk import did per row."""
+    errors = {}
+    for name, label in (('title', 'Title'), ('author', 'Author name')):
+        try:
+            legacy_clean_text(fields[name].clean(row[name]), label)
+        except ValidationError as exc:
+            errors[name] = exc.messages
+    try:
+        year = fields['publication_year'].clean(row['publication_year'])
+        if year and (year < 1000 or year > 2024):
+            raise ValidationError('Publication year must be between 1000 and 2024.')
+    except ValidationError as exc:
+        errors['publication_year'] = exc.messages
+    return errors
+
+
+class Command(BaseCommand):
+    """
+    Time BookForm's rules over generated import rows: the former
+    per-character loops against the compiled rules for single values, and
+    the former per-row field checks against BookValidator one row at a
+    time and a batch at a time. A full BookForm
+    per row is timed on a sample and extrapolated. Nothing touches the
+    database.
+    """
+    help = 'Benchmark compiled book validation rules against BookForm'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1000000, help='Number of generated rows')
+        parser.add_argument('--invalid', type=float, default=0.01, help='Share of rows with an unsafe title')
+        parser.add_argument('--form-sample', type=int, default=20000, help='Rows validated with a full BookForm')
+        parser.add_argument('--batch-size', type=int, default=2000, help='Rows per validate_rows() call')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed')
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        words = sorted({''.join(rng.choices(SYLLABLES, k=rng.randint(2, 4))) for _ in range(20000)})
+        rows = []
+        for _ in range(options['rows']):
+            title = ' '.join(rng.sample(words, 4)).title()
+            if rng.random() < options['invalid']:
+                title += rng.choice(UNSAFE)
+            rows.append({
+                'title': title,
+                'author': f'{rng.choice(words).title()} {rng.choice(SURNAMES)}',
+                'publication_year': str(rng.randint(1900, 2024)),
+            })
+        count = len(rows)
+        batch_size = options['batch_size']
+        validator = validation.BookValidator()
+
+        def text_rules(clean_title, clean_author):
+            for row in rows:
+                for clean, value in ((clean_title, row['title']), (clean_author, row['author'])):
+                    try:
+                        clean(value)
+                    except ValidationError:
+                        pass
+
+        sample = rows[:options['form_sample']]
+        timings = [
+            ('text rules, legacy loops', count, lambda: text_rules(
+                lambda value: legacy_clean_text(value, 'Title'), lambda value: legacy_clean_text(value, 'Author name')
+            )),
+            ('text rules, compiled', count, lambda: text_rules(validation.TITLE.clean, validation.AUTHOR.clean)),
+            ('BookForm per row (sample)', len(sample), lambda: [BookForm(data=row).is_valid() for row in sample]),
+            ('form fields + loops per row', count, lambda: [legacy_validate_row(BookForm.base_fields, row) for row in rows]),
+            ('BookValidator.validate', count, lambda: [validator.validate(row) for row in rows]),
+            ('BookValidator.validate_rows', count, lambda: [
+                validator.validate_rows(rows[start:start + batch_size]) for start in range(0, count, batch_size)
+            ]),
+        ]
+
+        invalid = sum(1 for data, _ in validator.validate_rows(rows) if data is None)
+        self.stdout.write(f'{count:,} rows, {invalid:,} invalid')
+        self.stdout.write(f'{"":<30}{"total":>12}{"per row":>12}{"per 1M rows":>14}')
+        for label, measured, func in timings:
+            start = time.perf_counter()
+            func()
+            elapsed = time.perf_counter() - start
+            per_row = elapsed / measured
+            self.stdout.write(f'{label:<30}{elapsed:>11.2f}s{per_row * 1e6:>10.2f}us{per_row * 1e6:>13.1f}s')
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, transaction
+
+from bookshelf import search
+
+
+class Command(BaseCommand):
+    """
+    Re-index every book for full-text search. Needed after writes that skip
+    model signals, such as bulk_create(), QuerySet.update() or raw SQL.
+    """
+    help = 'Rebuild the bookshelf full-text search index'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS, help='Database alias to rebuild')
+
+    def handle(self, *args, **options):
+        using = options['database']
+        search.create_index(using)
+        with transaction.atomic(using=using):
+            count = search.rebuild_index(using)
+        if count is None:
+            self.stdout.write(self.style.WARNING(
+                'Full-text search is not available on this database; searches use the ORM fallback.'
+            ))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'Indexed {count:,} books'))
@@ -0,0 +1,25 @@
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    from bookshelf import search
+
+    if search.create_index(schema_editor.connection.alias):
+        search.rebuild_index(schema_editor.connection.alias)
+
+
+def drop_search_index(apps, schema_editor):
+    from bookshelf import search
+
+    search.drop_index(schema_editor.connection.alias)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookshelf', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
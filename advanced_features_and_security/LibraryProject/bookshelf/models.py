@@ -1,5 +1,6 @@
 from django.contrib.auth.models import AbstractUser, BaseUserManager
 from django.db import models
+from django.db.models.functions import Lower
 from django.utils import timezone
 
 # Create your models here.
@@ -66,6 +67,11 @@ class CustomUser(AbstractUser):
             ('can_edit', 'Can edit user'),
             ('can_delete', 'Can delete user'),
         ]
+        indexes = [
+            # Case-insensitive prefix search in the admin's performance mode
+            models.Index(Lower('username'), name='bookshelf_user_username_lower'),
+            models.Index(Lower('email'), name='bookshelf_user_email_lower'),
+        ]
     
     def __str__(self):
         return self.username
@@ -95,6 +101,13 @@ class Book(models.Model):
             ('can_edit', 'Can edit book'),
             ('can_delete', 'Can delete book'),
         ]
+        indexes = [
+            # Serves the admin changelist's ordering without sorting the table
+            models.Index(fields=['title'], name='bookshelf_book_title_idx'),
+            # Author and year lookups (admin filters, listings), title-ordered
+            models.Index(fields=['author', 'title'], name='bookshelf_book_author_idx'),
+            models.Index(fields=['publication_year', 'title'], name='bookshelf_book_year_idx'),
+        ]
 
     def __str__(self):
         return self.title
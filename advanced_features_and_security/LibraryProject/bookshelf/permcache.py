@@ -0,0 +1,74 @@
+"""
+Shared cache of each user's permission set.
+
+ModelBackend computes a user's permissions with two joined queries the first
+time has_perm() is called in a request, and forgets them when the request
+ends. The sets are kept here instead, under keys that embed a global version
+number: any change that may affect many users (a group's permissions, a
+deleted group or permission) bumps the version and so retires every entry at
+once, while changes to one user's groups or permissions drop only that
+user's entries.
+"""
+from django.conf import settings
+from django.core.cache import caches
+
+VERSION_KEY = 'bookshelf:perms:version'
+
+
+def get_config():
+    config = {'ALIAS': 'default', 'TIMEOUT': 300}
+    config.update(getattr(settings, 'PERMISSION_CACHE', {}))
+    return config
+
+
+def get_cache():
+    return caches[get_config()['ALIAS']]
+
+
+def current_version(cache):
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        # add() so two processes starting together agree on the version
+        cache.add(VERSION_KEY, 1, None)
+        version = cache.get(VERSION_KEY, 1)
+    return version
+
+
+def user_key(version, user_id, is_superuser):
+    # Superusers hold every permission, so the flag is part of the key
+    return f'bookshelf:perms:{version}:{user_id}:{int(is_superuser)}'
+
+
+def get_permissions(user):
+    """The cached permission set of `user`, or None on a miss."""
+    cache = get_cache()
+    return cache.get(user_key(current_version(cache), user.pk, user.is_superuser))
+
+
+def set_permissions(user, permissions):
+    cache = get_cache()
+    cache.set(
+        user_key(current_version(cache), user.pk, user.is_superuser),
+        frozenset(permissions),
+        get_config()['TIMEOUT'],
+    )
+
+
+def invalidate_users(user_ids):
+    """Drop the cached permissions of the given users."""
+    cache = get_cache()
+    version = current_version(cache)
+    cache.delete_many([
+        user_key(version, user_id, is_superuser)
+        for user_id in user_ids for is_superuser in (False, True)
+    ])
+
+
+def invalidate_all():
+    """Retire every cached permission set by moving to a new version."""
+    cache = get_cache()
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        # The version key expired or was evicted; any new value will do
+        cache.set(VERSION_KEY, current_version(cache) + 1, None)
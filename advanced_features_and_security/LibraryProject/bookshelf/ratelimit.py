@@ -0,0 +1,162 @@
+import hashlib
+import math
+import os
+import struct
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache, wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+from django.utils.module_loading import import_string
+
+# take_token() and the bucket stores are also in api_project's api/throttling.py.
+# The projects are deployed separately and share no package, so a change to one
+# copy must be made to both.
+
+
+def take_token(state, capacity, refill_rate, now):
+    """
+    Apply one request to a token bucket.
+
+    `state` is (tokens, last_update) or None for a full bucket. Returns
+    (new_state, allowed, retry_after_seconds).
+    """
+    tokens, updated = state if state is not None else (capacity, now)
+    tokens = min(capacity, tokens + (now - updated) * refill_rate)
+    if tokens >= 1:
+        return (tokens - 1, now), True, None
+    return (tokens, now), False, (1 - tokens) / refill_rate
+
+
+class MemoryBucketStore:
+    """
+    Token buckets in a bounded in-process dict. Fast, but each worker
+    process keeps its own counters.
+    """
+    def __init__(self, max_keys=100000):
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def consume(self, key, capacity, refill_rate):
+        with self._lock:
+            state, allowed, retry_after = take_token(
+                self._buckets.get(key), capacity, refill_rate, time.monotonic()
+            )
+            self._buckets[key] = state
+            self._buckets.move_to_end(key)
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return allowed, retry_after
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+
+
+class CacheBucketStore:
+    """
+    Token buckets in a Django cache (e.g. local-memory or Memcached).
+    Reads and writes are not atomic, so concurrent requests for the same
+    key may occasionally both be allowed.
+    """
+    key_prefix = 'throttle:bucket:'
+
+    def __init__(self, alias='default'):
+        self.alias = alias
+
+    def consume(self, key, capacity, refill_rate):
+        cache = caches[self.alias]
+        cache_key = self.key_prefix + key
+        state, allowed, retry_after = take_token(
+            cache.get(cache_key), capacity, refill_rate, time.time()
+        )
+        # Once the bucket would be full again the entry carries no information
+        cache.set(cache_key, state, math.ceil(capacity / refill_rate) + 1)
+        return allowed, retry_after
+
+    def clear(self):
+        caches[self.alias].clear()
+
+
+class FileBucketStore:
+    """
+    Token buckets in small files under `directory`, one per key, updated
+    under an exclusive `flock`. Counters are shared by every process on the
+    host that uses the same directory.
+    """
+    record = struct.Struct('dd')
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def path_for(self, key):
+        return os.path.join(self.directory, hashlib.sha1(key.encode()).hexdigest())
+
+    def consume(self, key, capacity, refill_rate):
+        import fcntl
+
+        fd = os.open(self.path_for(key), os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            data = os.pread(fd, self.record.size, 0)
+            previous = self.record.unpack(data) if len(data) == self.record.size else None
+            state, allowed, retry_after = take_token(previous, capacity, refill_rate, time.time())
+            os.pwrite(fd, self.record.pack(*state), 0)
+        finally:
+            os.close(fd)
+        return allowed, retry_after
+
+    def clear(self):
+        for name in os.listdir(self.directory):
+            os.remove(os.path.join(self.directory, name))
+
+
+@lru_cache(maxsize=None)
+def get_bucket_store():
+    """Return the store configured by RATE_LIMIT_STORE."""
+    config = getattr(settings, 'RATE_LIMIT_STORE', {})
+    backend = import_string(config.get('BACKEND', 'bookshelf.ratelimit.MemoryBucketStore'))
+    return backend(**config.get('OPTIONS', {}))
+
+
+def parse_rate(rate):
+    """Parse 'N/period' (period: s, m, h or d) into (N, seconds)."""
+    num, period = rate.split('/')
+    return int(num), {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}[period[0]]
+
+
+def client_ident(request):
+    """Identify the caller: the user id when logged in, otherwise the client IP."""
+    if request.user.is_authenticated:
+        return f'user:{request.user.pk}'
+    return f"ip:{request.META.get('REMOTE_ADDR')}"
+
+
+def rate_limit(scope):
+    """
+    Limit a function view with a token bucket per user (or client IP).
+
+    The rate comes from RATE_LIMITS[scope] as 'N/period'. Requests over the
+    limit get a 429 response with a Retry-After header.
+    """
+    def decorator(view_func):
+        @wraps(view_func)
+        def _wrapped_view(request, *args, **kwargs):
+            rate = getattr(settings, 'RATE_LIMITS', {}).get(scope)
+            if rate:
+                num_requests, duration = parse_rate(rate)
+                allowed, retry_after = get_bucket_store().consume(
+                    f'ratelimit:{scope}:{client_ident(request)}', num_requests, num_requests / duration
+                )
+                if not allowed:
+                    response = HttpResponse('Too many requests. Please try again later.', status=429)
+                    response['Retry-After'] = str(math.ceil(retry_after))
+                    return response
+            return view_func(request, *args, **kwargs)
+        return _wrapped_view
+    return decorator
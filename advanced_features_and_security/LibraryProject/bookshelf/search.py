@@ -0,0 +1,189 @@
+"""
+Full-text search over Book title and author.
+
+On SQLite the books are indexed in an FTS5 table (created by migration
+0002_book_search_index) that holds one row per book, with rowid = book id.
+The index is kept in sync by the Book post_save/post_delete signals; after
+bulk writes that skip signals (bulk_create, QuerySet.update, raw SQL) run
+`python manage.py rebuild_search_index`. Matches are ranked with BM25,
+title hits weighing more than author hits, and every search term also
+matches as a prefix ("djan" finds "Django").
+
+Other database backends, or an SQLite build without FTS5, fall back to the
+ORM: each term must appear in the title or the author (icontains).
+"""
+import re
+from collections import namedtuple
+
+from django.db import DEFAULT_DB_ALIAS, OperationalError, connections
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+from .models import Book
+
+FTS_TABLE = 'bookshelf_book_fts'
+
+# BM25 column weights, in FTS_TABLE column order (title, author)
+TITLE_WEIGHT = 10.0
+AUTHOR_WEIGHT = 4.0
+
+MAX_TERMS = 8
+
+SearchPage = namedtuple('SearchPage', 'books page page_size has_next')
+
+_TERM_RE = re.compile(r'\w+', re.UNICODE)
+
+# Whether FTS_TABLE exists, per database alias; filled on first use
+_fts_tables = {}
+
+
+def terms(query):
+    """The words of `query`, lower-cased, at most MAX_TERMS of them."""
+    return [term.lower() for term in _TERM_RE.findall(query)][:MAX_TERMS]
+
+
+def match_expression(query_terms):
+    """
+    FTS5 MATCH expression requiring every term, each as a prefix. Terms are
+    quoted, so FTS5 operators and column filters in user input are inert.
+    """
+    return ' '.join('"%s"*' % term.replace('"', '""') for term in query_terms)
+
+
+def fts_enabled(using=DEFAULT_DB_ALIAS):
+    connection = connections[using]
+    if connection.vendor != 'sqlite':
+        return False
+    if using not in _fts_tables:
+        with connection.cursor() as cursor:
+            _fts_tables[using] = FTS_TABLE in connection.introspection.table_names(cursor)
+    return _fts_tables[using]
+
+
+def create_index(using=DEFAULT_DB_ALIAS):
+    """
+    Create FTS_TABLE if this SQLite build supports FTS5. Returns whether the
+    table exists afterwards.
+    """
+    connection = connections[using]
+    if connection.vendor != 'sqlite':
+        return False
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5('
+                "title, author, tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+            )
+    except OperationalError:
+        # SQLite compiled without FTS5: searches use the ORM fallback
+        return False
+    _fts_tables.pop(using, None)
+    return True
+
+
+def drop_index(using=DEFAULT_DB_ALIAS):
+    connection = connections[using]
+    if connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            cursor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+    _fts_tables.pop(using, None)
+
+
+def rebuild_index(using=DEFAULT_DB_ALIAS):
+    """Re-index every book. Returns the number of books indexed, or None without FTS."""
+    if not fts_enabled(using):
+        return None
+    book_table = Book._meta.db_table
+    with connections[using].cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE}')
+        cursor.execute(
+            f'INSERT INTO {FTS_TABLE} (rowid, title, author) SELECT id, title, author FROM {book_table}'
+        )
+        cursor.execute(f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}) VALUES ('optimize')")
+        cursor.execute(f'SELECT count(*) FROM {FTS_TABLE}')
+        return cursor.fetchone()[0]
+
+
+def index_book(book, using=DEFAULT_DB_ALIAS):
+    if fts_enabled(using):
+        with connections[using].cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [book.pk])
+            cursor.execute(
+                f'INSERT INTO {FTS_TABLE} (rowid, title, author) VALUES (%s, %s, %s)',
+                [book.pk, book.title, book.author],
+            )
+
+
+def index_books(books, using=DEFAULT_DB_ALIAS):
+    """Index newly created books (e.g. from bulk_create) in one statement."""
+    if books and fts_enabled(using):
+        with connections[using].cursor() as cursor:
+            cursor.executemany(
+                f'INSERT INTO {FTS_TABLE} (rowid, title, author) VALUES (%s, %s, %s)',
+                [(book.pk, book.title, book.author) for book in books],
+            )
+
+
+def unindex_book(book_id, using=DEFAULT_DB_ALIAS):
+    if fts_enabled(using):
+        with connections[using].cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [book_id])
+
+
+def search_books(query, page=1, page_size=20, using=DEFAULT_DB_ALIAS):
+    """
+    One page of books matching `query`, best matches first. Returns a
+    SearchPage; books is empty when the query has no searchable words.
+    """
+    page = max(1, page)
+    query_terms = terms(query)
+    if not query_terms:
+        return SearchPage([], page, page_size, False)
+    offset = (page - 1) * page_size
+    # One extra row tells whether there is a next page
+    if fts_enabled(using):
+        ids = _fts_ids(query_terms, offset, page_size + 1, using)
+        has_next = len(ids) > page_size
+        books_by_id = Book.objects.using(using).in_bulk(ids[:page_size])
+        books = [books_by_id[pk] for pk in ids[:page_size] if pk in books_by_id]
+    else:
+        books = list(_orm_queryset(query_terms, using)[offset:offset + page_size + 1])
+        has_next = len(books) > page_size
+        books = books[:page_size]
+    return SearchPage(books, page, page_size, has_next)
+
+
+def filter_books(queryset, query):
+    """
+    Restrict a Book queryset to books matching every term of `query`,
+    keeping its ordering. Uses FTS_TABLE when available.
+    """
+    query_terms = terms(query)
+    if not query_terms:
+        return queryset
+    if fts_enabled(queryset.db):
+        return queryset.filter(pk__in=RawSQL(
+            f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s', [match_expression(query_terms)]
+        ))
+    return queryset.filter(_orm_condition(query_terms))
+
+
+def _fts_ids(query_terms, offset, limit, using):
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s '
+            f'ORDER BY bm25({FTS_TABLE}, %s, %s), rowid LIMIT %s OFFSET %s',
+            [match_expression(query_terms), TITLE_WEIGHT, AUTHOR_WEIGHT, limit, offset],
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+def _orm_condition(query_terms):
+    condition = Q()
+    for term in query_terms:
+        condition &= Q(title__icontains=term) | Q(author__icontains=term)
+    return condition
+
+
+def _orm_queryset(query_terms, using):
+    return Book.objects.using(using).filter(_orm_condition(query_terms)).order_by('title', 'pk')
@@ -0,0 +1,88 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group, Permission
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from . import adminperf, autocomplete, caching, permcache, search
+from .models import Book
+
+User = get_user_model()
+
+CHANGE_ACTIONS = {'post_add', 'post_remove', 'post_clear'}
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+@receiver(m2m_changed, sender=User.user_permissions.through)
+def invalidate_user_permissions(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    A user's groups or direct permissions changed. From the user's side
+    only that user is affected; from the group's or permission's side,
+    the users in pk_set are (or, after a clear, an unknown set of users).
+    """
+    if action not in CHANGE_ACTIONS:
+        return
+    if not reverse:
+        permcache.invalidate_users([instance.pk])
+    elif pk_set:
+        permcache.invalidate_users(pk_set)
+    else:
+        permcache.invalidate_all()
+
+
+@receiver(m2m_changed, sender=Group.permissions.through)
+def invalidate_group_permissions(sender, action, **kwargs):
+    """A group gained or lost permissions: every member may be affected."""
+    if action in CHANGE_ACTIONS:
+        permcache.invalidate_all()
+
+
+@receiver(post_delete, sender=Group)
+@receiver(post_delete, sender=Permission)
+@receiver(post_save, sender=Permission)
+def invalidate_on_group_or_permission_change(sender, **kwargs):
+    permcache.invalidate_all()
+
+
+@receiver(post_save, sender=Book)
+def index_saved_book(sender, instance, using, **kwargs):
+    """Keep the full-text search index in step with the books table."""
+    search.index_book(instance, using)
+
+
+@receiver(post_delete, sender=Book)
+def unindex_deleted_book(sender, instance, using, **kwargs):
+    search.unindex_book(instance.pk, using)
+
+
+@receiver(post_save, sender=Book)
+def update_autocomplete(sender, instance, **kwargs):
+    """Refresh this process's typeahead index once the change is committed."""
+    transaction.on_commit(lambda: autocomplete.book_saved(instance))
+
+
+@receiver(post_delete, sender=Book)
+def remove_from_autocomplete(sender, instance, **kwargs):
+    book_id = instance.pk
+    transaction.on_commit(lambda: autocomplete.book_deleted(book_id))
+
+
+@receiver(post_save, sender=Book)
+@receiver(post_delete, sender=Book)
+def invalidate_book_pages(sender, **kwargs):
+    """
+    Retire cached book pages and objects. Bumped after commit, so a request
+    reading the old rows meanwhile cannot cache them under the new version.
+    """
+    transaction.on_commit(caching.bump_books_version)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user_count(sender, created=True, **kwargs):
+    """
+    Retire the admin's cached user count when users are added or removed.
+    Other saves (e.g. last_login on every login) leave the count alone.
+    """
+    if created:
+        transaction.on_commit(lambda: adminperf.bump_model_version(User))
@@ -1,3 +1,487 @@
-from django.test import TestCase
+import csv
+import io
+import json
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group, Permission
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from . import autocomplete, bulk, search, validation
+from .forms import BookForm, SecureSearchForm
+from .models import Book
+from .ratelimit import get_bucket_store
+
+
+class RateLimitTests(TestCase):
+    """
+    Tests for the token-bucket rate limit on secure_book_search.
+    """
+    def setUp(self):
+        get_bucket_store().clear()
+        self.user = get_user_model().objects.create_user(username='reader', email='reader@example.com', password='secret-pass-123')
+        self.client.force_login(self.user)
+
+    @override_settings(RATE_LIMITS={'book_search': '3/m'})
+    def test_search_is_rate_limited_per_user(self):
+        url = reverse('book_search')
+        for _ in range(3):
+            self.assertEqual(self.client.get(url, {'q': 'django'}).status_code, 200)
+        response = self.client.get(url, {'q': 'django'})
+        self.assertEqual(response.status_code, 429)
+        self.assertGreaterEqual(int(response['Retry-After']), 1)
+
+        other = get_user_model().objects.create_user(username='other', email='other@example.com', password='secret-pass-123')
+        self.client.force_login(other)
+        self.assertEqual(self.client.get(url, {'q': 'django'}).status_code, 200)
+
+
+class PermissionCacheTests(TestCase):
+    """
+    Tests for the shared permission cache behind CachedPermissionBackend.
+    """
+    def setUp(self):
+        cache.clear()
+        self.book = Book.objects.create(title='Django', author='Someone', publication_year=2020)
+        self.can_view = Permission.objects.get(codename='can_view', content_type__app_label='bookshelf',
+                                               content_type__model='book')
+        self.editors = Group.objects.create(name='Editors')
+        self.editors.permissions.add(self.can_view)
+        self.user = get_user_model().objects.create_user(username='editor', email='editor@example.com', password='secret-pass-123')
+        self.user.groups.add(self.editors)
+        self.client.force_login(self.user)
+        self.url = reverse('book_detail', args=[self.book.pk])
+
+    def permission_queries(self):
+        """Permission lookups run while fetching the book detail page."""
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get(self.url)
+        return response, [q['sql'] for q in captured.captured_queries if 'auth_permission' in q['sql']]
+
+    def test_permissions_are_cached_across_requests(self):
+        response, queries = self.permission_queries()
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(queries)
+        response, queries = self.permission_queries()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(queries, [])
+
+    def test_group_permission_change_invalidates(self):
+        self.permission_queries()
+        self.editors.permissions.remove(self.can_view)
+        response, _ = self.permission_queries()
+        self.assertEqual(response.status_code, 403)
+
+    def test_group_membership_change_invalidates(self):
+        self.permission_queries()
+        self.user.groups.remove(self.editors)
+        self.assertEqual(self.permission_queries()[0].status_code, 403)
+        self.editors.user_set.add(self.user)
+        self.assertEqual(self.permission_queries()[0].status_code, 200)
+
+
+class BookSearchTests(TestCase):
+    """
+    Tests for the full-text search behind secure_book_search.
+    """
+    @classmethod
+    def setUpTestData(cls):
+        cls.django_book = Book.objects.create(title='Two Scoops of Django', author='Daniel Greenfeld', publication_year=2020)
+        cls.by_django = Book.objects.create(title='Web Patterns', author='Jane Django', publication_year=2018)
+        cls.python_book = Book.objects.create(title='Fluent Python', author='Luciano Ramalho', publication_year=2015)
+
+    def titles(self, query, **kwargs):
+        return [book.title for book in search.search_books(query, **kwargs).books]
+
+    def test_index_is_used_on_sqlite(self):
+        self.assertTrue(search.fts_enabled())
+
+    def test_matches_title_and_author_ranked(self):
+        # Title matches outrank author matches
+        self.assertEqual(self.titles('django'), ['Two Scoops of Django', 'Web Patterns'])
+        self.assertEqual(self.titles('ramalho'), ['Fluent Python'])
+
+    def test_prefix_and_all_terms(self):
+        self.assertEqual(self.titles('flu pyth'), ['Fluent Python'])
+        self.assertEqual(self.titles('fluent django'), [])
+
+    def test_operators_in_input_are_literal(self):
+        for query in ('django OR python', 'title:django', '"django', 'NEAR(django python)', '*'):
+            search.search_books(query)
+        self.assertEqual(self.titles('"django" OR'), [])
+
+    def test_pagination(self):
+        Book.objects.bulk_create(
+            Book(title=f'Django Volume {i}', author='Series', publication_year=2000) for i in range(5)
+        )
+        search.rebuild_index()
+        first = search.search_books('django', page_size=4)
+        second = search.search_books('django', page=2, page_size=4)
+        self.assertTrue(first.has_next)
+        self.assertFalse(second.has_next)
+        self.assertEqual(len(first.books) + len(second.books), 7)
+        self.assertFalse({b.pk for b in first.books} & {b.pk for b in second.books})
+
+    def test_index_follows_saves_and_deletes(self):
+        self.python_book.title = 'Effective Python'
+        self.python_book.save()
+        self.assertEqual(self.titles('fluent'), [])
+        self.assertEqual(self.titles('effective'), ['Effective Python'])
+        self.python_book.delete()
+        self.assertEqual(self.titles('python'), [])
+
+    def test_orm_fallback(self):
+        with mock.patch.object(search, 'fts_enabled', return_value=False):
+            self.assertEqual(self.titles('django'), ['Two Scoops of Django', 'Web Patterns'])
+            self.assertEqual(self.titles('luciano fluent'), ['Fluent Python'])
+
+    def test_search_view(self):
+        get_bucket_store().clear()
+        user = get_user_model().objects.create_user(username='reader', email='reader@example.com', password='secret-pass-123')
+        self.client.force_login(user)
+        response = self.client.get(reverse('book_search'), {'q': 'greenfeld'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(response.context['books']), [self.django_book])
+
+
+class AutocompleteTests(TestCase):
+    """
+    Tests for the in-memory typeahead index and its JSON endpoint.
+    """
+    @classmethod
+    def setUpTestData(cls):
+        cls.django_book = Book.objects.create(title='Two Scoops of Django', author='Daniel Greenfeld', publication_year=2020)
+        cls.patterns = Book.objects.create(title='Django Design Patterns', author='Arun Ravindran', publication_year=2015)
+        Book.objects.create(title='Daniel Deronda', author='George Eliot', publication_year=1876)
+        Book.objects.create(title='Middlemarch', author='George Eliot', publication_year=1871)
+
+    def setUp(self):
+        autocomplete.reset()
+        self.addCleanup(autocomplete.reset)
+
+    def test_title_and_author_prefixes(self):
+        self.assertEqual(autocomplete.suggest('DJ'), {
+            'titles': [{'id': self.patterns.pk, 'title': 'Django Design Patterns'}],
+            'authors': [],
+        })
+        suggestions = autocomplete.suggest('dan')
+        self.assertEqual([t['title'] for t in suggestions['titles']], ['Daniel Deronda'])
+        self.assertEqual(suggestions['authors'], ['Daniel Greenfeld'])
+        # Authors of several books are suggested once
+        self.assertEqual(autocomplete.suggest('george')['authors'], ['George Eliot'])
+
+    def test_lookups_do_not_query_once_loaded(self):
+        autocomplete.suggest('d')
+        with self.assertNumQueries(0):
+            autocomplete.suggest('two')
+
+    def test_index_follows_saves_and_deletes(self):
+        autocomplete.suggest('d')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.django_book.title = 'Three Scoops of Django'
+            self.django_book.save()
+            Book.objects.create(title='Twilight', author='Stephenie Meyer', publication_year=2005)
+        self.assertEqual([t['title'] for t in autocomplete.suggest('t')['titles']],
+                         ['Three Scoops of Django', 'Twilight'])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.patterns.delete()
+        self.assertEqual(autocomplete.suggest('django')['titles'], [])
+
+    def test_limit(self):
+        index = autocomplete.BookAutocomplete((pk, f'Book {pk:03}', 'Author') for pk in range(1, 51))
+        self.assertEqual(len(index.suggest('book', 5)['titles']), 5)
+        self.assertEqual(index.suggest('book 04', 20)['titles'][0], {'id': 40, 'title': 'Book 040'})
+
+    def test_endpoint(self):
+        get_bucket_store().clear()
+        user = get_user_model().objects.create_user(username='reader', email='reader@example.com', password='secret-pass-123')
+        url = reverse('book_autocomplete')
+        self.assertEqual(self.client.get(url, {'q': 'two'}).status_code, 302)
+        self.client.force_login(user)
+        response = self.client.get(url, {'q': 'two', 'limit': '500'})
+        self.assertEqual(response.json(), {
+            'query': 'two',
+            'titles': [{'id': self.django_book.pk, 'title': 'Two Scoops of Django'}],
+            'authors': [],
+        })
+        self.assertEqual(self.client.get(url, {'q': ''}).json()['titles'], [])
+
+
+class BookPageCacheTests(TestCase):
+    """
+    Tests for the cached book_list and book_detail fragments.
+    """
+    @classmethod
+    def setUpTestData(cls):
+        cls.book = Book.objects.create(title='Cached Book', author='Someone', publication_year=2021)
+        permissions = Permission.objects.filter(content_type__app_label='bookshelf', content_type__model='book')
+        cls.viewer = get_user_model().objects.create_user(username='viewer', email='viewer@example.com', password='secret-pass-123')
+        cls.viewer.user_permissions.add(permissions.get(codename='can_view'))
+        cls.editor = get_user_model().objects.create_user(username='editor', email='editor@example.com', password='secret-pass-123')
+        cls.editor.user_permissions.add(*permissions.filter(codename__in=['can_view', 'can_edit']))
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.viewer)
+
+    def book_queries(self, url):
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get(url)
+        return response, [q['sql'] for q in captured.captured_queries if 'FROM "bookshelf_book"' in q['sql']]
+
+    def test_list_is_served_from_cache(self):
+        response, queries = self.book_queries(reverse('book_list'))
+        self.assertContains(response, 'Cached Book')
+        self.assertTrue(queries)
+        response, queries = self.book_queries(reverse('book_list'))
+        self.assertContains(response, 'Cached Book')
+        self.assertEqual(queries, [])
+
+    def test_detail_is_served_from_cache(self):
+        url = reverse('book_detail', args=[self.book.pk])
+        self.book_queries(url)
+        response, queries = self.book_queries(url)
+        self.assertContains(response, 'Cached Book')
+        self.assertEqual(queries, [])
+        self.assertEqual(self.client.get(reverse('book_detail', args=[self.book.pk + 100])).status_code, 404)
+
+    def test_fragments_are_per_permission_class(self):
+        edit_url = reverse('book_edit', args=[self.book.pk])
+        self.assertNotContains(self.client.get(reverse('book_list')), edit_url)
+        self.client.force_login(self.editor)
+        self.assertContains(self.client.get(reverse('book_list')), edit_url)
+
+    def test_saves_and_deletes_invalidate(self):
+        self.client.get(reverse('book_list'))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.book.title = 'Renamed Book'
+            self.book.save()
+        self.assertContains(self.client.get(reverse('book_list')), 'Renamed Book')
+        url = reverse('book_detail', args=[self.book.pk])
+        self.assertContains(self.client.get(url), 'Renamed Book')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.book.delete()
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+    def test_permission_checks_still_run(self):
+        self.client.get(reverse('book_list'))
+        other = get_user_model().objects.create_user(username='nobody', email='nobody@example.com', password='secret-pass-123')
+        self.client.force_login(other)
+        self.assertEqual(self.client.get(reverse('book_list')).status_code, 403)
+
+
+class BookImportExportTests(TestCase):
+    """
+    Tests for the bulk CSV/JSON Lines import and streaming export views.
+    """
+    @classmethod
+    def setUpTestData(cls):
+        permissions = Permission.objects.filter(content_type__app_label='bookshelf', content_type__model='book',
+                                                codename__in=['can_view', 'can_create'])
+        cls.user = get_user_model().objects.create_user(username='loader', email='loader@example.com', password='secret-pass-123')
+        cls.user.user_permissions.add(*permissions)
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.user)
+
+    def upload(self, name, content):
+        return self.client.post(reverse('book_import'), {'file': SimpleUploadedFile(name, content.encode())})
+
+    def test_csv_import_reports_invalid_rows(self):
+        response = self.upload('books.csv', (
+            'title,author,publication_year\n'
+            'Dune,Frank Herbert,1965\n'
+            'X,Frank Herbert,1965\n'
+            'Neuromancer,William Gibson,not a year\n'
+            '<b>Bold</b>,Someone,2000\n'
+            'Hyperion,Dan Simmons,1989\n'
+        ))
+        result = response.context['result']
+        self.assertEqual((result.rows, result.created, result.error_count), (5, 2, 3))
+        self.assertEqual([error.line for error in result.errors], [3, 4, 5])
+        self.assertIn('title', result.errors[0].errors)
+        self.assertIn('publication_year', result.errors[1].errors)
+        self.assertEqual(sorted(Book.objects.values_list('title', flat=True)), ['Dune', 'Hyperion'])
+        # Imported books are searchable straight away
+        self.assertEqual([book.title for book in search.search_books('herbert').books], ['Dune'])
+
+    def test_jsonl_import_in_batches(self):
+        lines = '\n'.join(
+            json.dumps({'title': f'Volume {i}', 'author': 'Series Author', 'publication_year': 2000 + i % 20})
+            for i in range(25)
+        )
+        result = bulk.import_books(SimpleUploadedFile('books.jsonl', lines.encode()), batch_size=10)
+        self.assertEqual((result.rows, result.created, result.error_count), (25, 25, 0))
+        self.assertEqual(Book.objects.count(), 25)
+
+    def test_malformed_file_stops_import(self):
+        response = self.upload('books.jsonl', '{"title": "Dune", "author": "Frank Herbert", "publication_year": 1965}\n[1, 2]\n')
+        result = response.context['result']
+        self.assertEqual(result.created, 1)
+        self.assertIn('Line 2', result.aborted)
+
+    def test_unsupported_file_type(self):
+        response = self.upload('books.txt', 'title\nDune\n')
+        self.assertIsNone(response.context['result'])
+        self.assertTrue(response.context['form'].errors)
+
+    def test_import_requires_create_permission(self):
+        other = get_user_model().objects.create_user(username='reader', email='reader@example.com', password='secret-pass-123')
+        self.client.force_login(other)
+        self.assertEqual(self.client.get(reverse('book_import')).status_code, 403)
+
+    def test_export_streams_csv_and_jsonl(self):
+        Book.objects.create(title='Dune', author='Frank Herbert', publication_year=1965)
+        Book.objects.create(title='Emma', author='Jane Austen', publication_year=1815)
+        with mock.patch.object(bulk, 'EXPORT_CHUNK_SIZE', 1):
+            response = self.client.get(reverse('book_export'))
+            self.assertTrue(response.streaming)
+            rows = list(csv.DictReader(io.StringIO(b''.join(response.streaming_content).decode())))
+            self.assertEqual([row['title'] for row in rows], ['Dune', 'Emma'])
+
+            response = self.client.get(reverse('book_export'), {'format': 'jsonl'})
+            records = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+            self.assertEqual(records[1], {'id': records[1]['id'], 'title': 'Emma', 'author': 'Jane Austen', 'publication_year': 1815})
+
+
+class ValidationRuleTests(SimpleTestCase):
+    """
+    Tests for the compiled validation rules shared by the forms and bulk import.
+    """
+    rows = [
+        {'title': 'Dune', 'author': 'Frank Herbert', 'publication_year': '1965'},
+        {'title': '  Emma  ', 'author': ' Jane Austen ', 'publication_year': 1815},
+        {'title': 'X', 'author': 'A & B', 'publication_year': '3000'},
+        {'title': 'Fine title', 'author': 'O"Brien', 'publication_year': '1990.0'},
+        {'title': '<i>Italic</i>', 'author': 'Someone', 'publication_year': ' 2001 '},
+        {'title': 'T' * 201, 'author': 'Nul\x00Char', 'publication_year': 'soon'},
+        {'title': '   ', 'author': None, 'publication_year': ''},
+        {'author': 'No Title', 'publication_year': 0},
+        {'title': 'Dune', 'author': "O'Neil", 'publication_year': True},
+    ]
+
+    def form_result(self, row):
+        form = BookForm(data={name: value for name, value in row.items() if value is not None})
+        if form.is_valid():
+            return form.cleaned_data, None
+        return None, {name: list(messages) for name, messages in form.errors.items()}
+
+    def test_rows_match_book_form(self):
+        validator = validation.BookValidator()
+        expected = [self.form_result(row) for row in self.rows]
+        self.assertEqual(validator.validate_rows(self.rows), expected)
+        self.assertEqual([validator.validate(row) for row in self.rows], expected)
+
+    def test_batch_scan_maps_matches_to_rows(self):
+        values = ['plain', 'a<b', 'also plain', 'x', 'quote"', 'ok']
+        self.assertEqual(
+            validation.TITLE.check_many(values),
+            [validation.TITLE.check(value) for value in values],
+        )
+        self.assertEqual(validation.MESSAGE.check_many(['Say hello to everyone', 'Click JavaScript:alert(1)']),
+                         [None, 'Message contains potentially dangerous content.'])
+
+    def test_search_query_is_sanitized(self):
+        form = SecureSearchForm(data={'query': '  <b>"rock" & roll</b>; drop--table  '})
+        self.assertTrue(form.is_valid())
+        self.assertEqual(form.cleaned_data['query'], 'brock  roll/b droptable')
+        self.assertEqual(validation.clean_query('a' * 150), 'a' * 100)
+
+
+@override_settings(ADMIN_PERFORMANCE={'ENABLED': True, 'FILTER_CHOICES': 2})
+class AdminPerformanceTests(TestCase):
+    """
+    Tests for the admin changelist performance mode.
+    """
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = get_user_model().objects.create_superuser(username='admin', email='admin@example.com', password='secret-pass-123')
+        Book.objects.bulk_create([
+            Book(title=title, author=author, publication_year=1965)
+            for title, author in [('Dune', 'Frank Herbert'), ('Dune Messiah', 'Frank Herbert'),
+                                  ('Children of Dune', 'Frank Herbert'), ('Emma', 'Jane Austen'),
+                                  ('Persuasion', 'Jane Austen'), ('Hyperion', 'Dan Simmons')]
+        ])
+        search.rebuild_index()
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.admin)
+
+    def changelist(self, params=None, url=None):
+        response = self.client.get(url or reverse('admin:bookshelf_book_changelist'), params or {})
+        self.assertEqual(response.status_code, 200)
+        return response.context['cl']
+
+    def test_counts_and_filter_choices_are_cached(self):
+        self.changelist()
+        with CaptureQueriesContext(connection) as queries:
+            cl = self.changelist()
+        sql = ' '.join(query['sql'] for query in queries.captured_queries)
+        self.assertNotIn('COUNT(', sql)
+        self.assertNotIn('GROUP BY', sql)
+        self.assertEqual(cl.result_count, 6)
+        self.assertIsNone(cl.full_result_count)
+        author_filter = next(spec for spec in cl.filter_specs if spec.field_path == 'author')
+        self.assertEqual(author_filter.lookup_choices, ['Frank Herbert', 'Jane Austen'])
+
+    def test_book_changes_refresh_cached_count(self):
+        self.changelist()
+        with self.captureOnCommitCallbacks(execute=True):
+            Book.objects.create(title='Emma', author='Jane Austen', publication_year=1815)
+        self.assertEqual(self.changelist().result_count, 7)
+
+    def test_large_tables_use_statistics(self):
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+        Book.objects.bulk_create([Book(title='Later', author='Someone', publication_year=2000)])
+        with override_settings(ADMIN_PERFORMANCE={'ENABLED': True, 'ESTIMATE_THRESHOLD': 5}):
+            self.assertEqual(self.changelist().result_count, 6)
+        self.assertEqual(self.changelist().result_count, 7)
+
+    def test_search_uses_index_and_caps_count(self):
+        cl = self.changelist({'q': 'dun'})
+        self.assertEqual(sorted(book.title for book in cl.result_list), ['Children of Dune', 'Dune', 'Dune Messiah'])
+        with override_settings(ADMIN_PERFORMANCE={'ENABLED': True, 'COUNT_LIMIT': 2}):
+            self.assertEqual(self.changelist({'q': 'dun'}).result_count, 2)
+
+    def test_user_changes_refresh_cached_count(self):
+        url = reverse('admin:bookshelf_customuser_changelist')
+        self.assertEqual(self.changelist(url=url).result_count, 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            user = get_user_model().objects.create_user(username='newcomer', email='new@example.com', password='secret-pass-123')
+        self.assertEqual(self.changelist(url=url).result_count, 2)
+        with self.captureOnCommitCallbacks(execute=True):
+            user.delete()
+        self.assertEqual(self.changelist(url=url).result_count, 1)
+
+    def test_user_search_matches_username_prefix(self):
+        get_user_model().objects.create_user(username='adminton', email='a@example.com', password='secret-pass-123')
+        get_user_model().objects.create_user(username='badmin', email='b@example.com', password='secret-pass-123')
+        cl = self.changelist({'q': 'admin'}, reverse('admin:bookshelf_customuser_changelist'))
+        self.assertEqual(sorted(user.username for user in cl.result_list), ['admin', 'adminton'])
+
+    def test_user_search_ignores_case_and_matches_email(self):
+        User = get_user_model()
+        User.objects.create_user(username='JaneD', email='jane@example.com', password='secret-pass-123')
+        User.objects.create_user(username='reader', email='Jane.Doe@Example.com', first_name='Jane',
+                                 last_name='Doe', password='secret-pass-123')
+        url = reverse('admin:bookshelf_customuser_changelist')
+        cl = self.changelist({'q': 'JANE'}, url)
+        self.assertEqual(sorted(user.username for user in cl.result_list), ['JaneD', 'reader'])
+        self.assertIn('email', cl.search_help_text)
+        # Several words get the full search, names included
+        cl = self.changelist({'q': 'Jane Doe'}, url)
+        self.assertEqual([user.username for user in cl.result_list], ['reader'])
+
+    @override_settings(ADMIN_PERFORMANCE={'ENABLED': False})
+    def test_disabled(self):
+        cl = self.changelist({'q': 'une'})
+        self.assertEqual(cl.result_count, 3)
+        self.assertEqual(cl.full_result_count, 6)
@@ -7,6 +7,8 @@ urlpatterns = [
     path('books/', views.book_list, name='book_list'),
     path('books/<int:pk>/', views.book_detail, name='book_detail'),
     path('books/create/', views.book_create, name='book_create'),
+    path('books/import/', views.book_import, name='book_import'),
+    path('books/export/', views.book_export, name='book_export'),
     path('books/<int:pk>/edit/', views.book_edit, name='book_edit'),
     path('books/<int:pk>/delete/', views.book_delete, name='book_delete'),
     
@@ -18,6 +20,7 @@ urlpatterns = [
     
     # Security-focused search functionality
     path('books/search/', views.secure_book_search, name='book_search'),
+    path('books/autocomplete/', views.book_autocomplete, name='book_autocomplete'),
     
     # Example form demonstrating security features
     path('form-example/', views.form_example, name='form_example'),
@@ -2,12 +2,21 @@ from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import permission_required, login_required
 from django.contrib.auth.mixins import PermissionRequiredMixin
 from django.contrib import messages
-from django.http import HttpResponseForbidden
+from django.http import HttpResponseForbidden, JsonResponse, StreamingHttpResponse
+from django.template.defaultfilters import pluralize
 from django.views.generic import ListView, CreateView, UpdateView, DeleteView
 from django.urls import reverse_lazy
 from .models import Book, CustomUser
-from .forms import BookForm, ExampleForm
+from .forms import BookForm, BookImportForm, ExampleForm
 from .forms import ExampleForm
+from .ratelimit import rate_limit
+from .search import search_books
+from . import autocomplete, bulk, caching
+
+# Search results shown per page
+SEARCH_PAGE_SIZE = 20
+# Most suggestions a typeahead request may ask for
+AUTOCOMPLETE_MAX_LIMIT = 20
 
 # Create your views here.
 
@@ -17,17 +26,20 @@ from .forms import ExampleForm
 def book_list(request):
     """
     Display list of books. Requires 'can_view' permission.
+    The book grid is a cached fragment, so the (lazy) queryset is only
+    evaluated when the books or the viewer's permission class changed.
     """
     books = Book.objects.all()
-    return render(request, 'bookshelf/book_list.html', {'books': books})
+    return render(request, 'bookshelf/book_list.html', {'books': books, **caching.page_context(request)})
 
 @permission_required('bookshelf.can_view', raise_exception=True)
 def book_detail(request, pk):
     """
     Display details of a specific book. Requires 'can_view' permission.
+    The book and its rendered card are served from bookshelf.caching.
     """
-    book = get_object_or_404(Book, pk=pk)
-    return render(request, 'bookshelf/book_detail.html', {'book': book})
+    book = caching.get_book(pk)
+    return render(request, 'bookshelf/book_detail.html', {'book': book, **caching.page_context(request)})
 
 @permission_required('bookshelf.can_create', raise_exception=True)
 def book_create(request):
@@ -73,6 +85,36 @@ def book_delete(request, pk):
         return redirect('book_list')
     return render(request, 'bookshelf/book_confirm_delete.html', {'book': book})
 
+@permission_required('bookshelf.can_create', raise_exception=True)
+def book_import(request):
+    """
+    Bulk-create books from an uploaded CSV or JSON Lines file.
+    Requires 'can_create' permission. Rows are streamed, validated with
+    BookForm's rules and inserted in batches; invalid rows are reported.
+    """
+    result = None
+    if request.method == 'POST':
+        form = BookImportForm(request.POST, request.FILES)
+        if form.is_valid():
+            result = bulk.import_books(form.cleaned_data['file'])
+            if result.created:
+                messages.success(request, f'Imported {result.created} book{pluralize(result.created)}.')
+    else:
+        form = BookImportForm()
+    return render(request, 'bookshelf/book_import.html', {'form': form, 'result': result})
+
+@permission_required('bookshelf.can_view', raise_exception=True)
+def book_export(request):
+    """
+    Stream every book as CSV (default) or JSON Lines (?format=jsonl).
+    Requires 'can_view' permission.
+    """
+    fmt = 'jsonl' if request.GET.get('format') == 'jsonl' else 'csv'
+    content_type = 'application/x-ndjson' if fmt == 'jsonl' else 'text/csv'
+    response = StreamingHttpResponse(bulk.export_books(fmt), content_type=f'{content_type}; charset=utf-8')
+    response['Content-Disposition'] = f'attachment; filename="books.{fmt}"'
+    return response
+
 # Class-based views with permission mixins
 
 class BookListView(PermissionRequiredMixin, ListView):
@@ -128,31 +170,54 @@ class BookDeleteView(PermissionRequiredMixin, DeleteView):
 
 # Security-focused example view with input validation
 @login_required
+@rate_limit('book_search')
 def secure_book_search(request):
     """
     Secure search functionality that prevents SQL injection.
-    Uses Django ORM for safe database queries.
+    Search terms are matched against title and author through the
+    bookshelf.search full-text index, using bound parameters only.
+    Rate limited per user to protect the database from load spikes.
     """
-    books = []
+    results = None
     query = None
     
     if request.method == 'GET' and 'q' in request.GET:
         # Get and sanitize user input
-        query = request.GET.get('q', '').strip()
+        query = request.GET.get('q', '').strip()[:100]
         
         if query:
-            # Use Django ORM to prevent SQL injection
-            # Instead of raw SQL: "SELECT * FROM books WHERE title LIKE '%{}%'".format(query)
-            # We use Django's safe ORM methods:
-            books = Book.objects.filter(
-                title__icontains=query
-            ).distinct()[:50]  # Limit results to prevent performance issues
+            try:
+                page = int(request.GET.get('page', 1))
+            except ValueError:
+                page = 1
+            # Ranked, paginated results; user input only ever reaches the
+            # database as a bound parameter
+            results = search_books(query, page=page, page_size=SEARCH_PAGE_SIZE)
     
     return render(request, 'bookshelf/book_search.html', {
-        'books': books,
+        'books': results.books if results else [],
+        'results': results,
         'query': query
     })
 
+@login_required
+@rate_limit('book_autocomplete')
+def book_autocomplete(request):
+    """
+    JSON title and author suggestions for the search box typeahead.
+    Answered from the in-memory prefix index in bookshelf.autocomplete,
+    without a database query.
+    """
+    config = autocomplete.get_config()
+    prefix = request.GET.get('q', '').strip()[:100]
+    try:
+        limit = min(int(request.GET.get('limit', config['LIMIT'])), AUTOCOMPLETE_MAX_LIMIT)
+    except ValueError:
+        limit = config['LIMIT']
+    if len(prefix) < config['MIN_LENGTH'] or limit < 1:
+        return JsonResponse({'query': prefix, 'titles': [], 'authors': []})
+    return JsonResponse({'query': prefix, **autocomplete.suggest(prefix, limit)})
+
 # Example Form View demonstrating security features
 def form_example(request):
     """
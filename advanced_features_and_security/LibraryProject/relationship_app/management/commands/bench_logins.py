@@ -0,0 +1,82 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models.signals import post_save
+from django.test import Client
+
+from relationship_app.models import UserProfile, save_user_profile
+
+
+def legacy_save_user_profile(sender, instance, **kwargs):
+    # The handler as it used to be: an unconditional profile UPDATE per user save
+    instance.userprofile.save(force_update=True)
+
+
+class Command(BaseCommand):
+    """
+    Measure logins/sec and queries per login with the current profile
+    signal handler and with the old save-on-every-user-save handler.
+
+    Each login goes through django.contrib.auth.login() (session rotation
+    and the last_login update), bypassing password hashing so the signal
+    path is not drowned out by PBKDF2. Users are created inside a
+    transaction that is rolled back afterwards.
+    """
+    help = 'Benchmark login throughput with the current and legacy UserProfile signal handlers'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=200, help='Users to create')
+        parser.add_argument('--logins', type=int, default=2000, help='Logins per run')
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+        users_count, logins = options['users'], options['logins']
+        user_model_label = User._meta.label
+
+        with transaction.atomic():
+            users = User.objects.bulk_create(
+                User(username=f'bench-login-{i}', email=f'bench-login-{i}@example.com')
+                for i in range(users_count)
+            )
+            UserProfile.objects.create_for_users(users)
+            users = list(User.objects.filter(username__startswith='bench-login-'))
+
+            results = {}
+            for name, handler in (('legacy', legacy_save_user_profile), ('current', save_user_profile)):
+                post_save.disconnect(save_user_profile, sender=user_model_label)
+                post_save.connect(handler, sender=user_model_label)
+                try:
+                    results[name] = self.run(users, logins)
+                finally:
+                    post_save.disconnect(handler, sender=user_model_label)
+                    post_save.connect(save_user_profile, sender=user_model_label)
+                elapsed, queries = results[name]
+                self.stdout.write(
+                    f'{name:<8} {logins / elapsed:10,.0f} logins/sec  {queries / logins:5.2f} queries/login'
+                )
+            transaction.set_rollback(True)
+
+        speedup = results['legacy'][0] / results['current'][0]
+        self.stdout.write(self.style.SUCCESS(f'Login speedup: {speedup:.2f}x'))
+
+    @staticmethod
+    def run(users, logins):
+        client = Client()
+        queries = 0
+
+        def counter(execute, sql, params, many, context):
+            nonlocal queries
+            queries += 1
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(counter):
+            start = time.perf_counter()
+            for i in range(logins):
+                # As returned by authenticate(): the profile is not loaded yet
+                user = users[i % len(users)]
+                user._state.fields_cache.pop('userprofile', None)
+                client.force_login(user)
+            elapsed = time.perf_counter() - start
+        return elapsed, queries
@@ -1,10 +1,11 @@
+from django.conf import settings
 from django.db import models
-from django.contrib.auth.models import User
 from django.db.models.signals import post_save
 from django.dispatch import receiver
 
 class Author(models.Model):
-    name = models.CharField(max_length=255)
+    # Authors are looked up, and bulk imports resolved, by name
+    name = models.CharField(max_length=255, unique=True)
     
     def __str__(self):
         return self.name
@@ -19,15 +20,35 @@ class Book(models.Model):
             ('can_change_book', 'Can change book'),
             ('can_delete_book', 'Can delete book'),
         ]
+        constraints = [
+            # A title identifies a book among its author's books; the
+            # constraint's index also serves lookups by author
+            models.UniqueConstraint(fields=['author', 'title'], name='relationship_app_book_author_title_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['title'], name='relationship_book_title_idx'),
+        ]
 
 class Library(models.Model):
-    name = models.CharField(max_length=255)
+    name = models.CharField(max_length=255, unique=True)
     books = models.ManyToManyField(Book)
 
 class Librarian(models.Model):
     name = models.CharField(max_length=255)
     library = models.OneToOneField(Library, on_delete=models.CASCADE)
 
+class UserProfileManager(models.Manager):
+    def create_for_users(self, users, role='Member', batch_size=None):
+        """
+        Create profiles for users added with bulk_create(), which skips the
+        post_save signal. Users that already have a profile are left alone.
+        """
+        return self.bulk_create(
+            [self.model(user_id=user.pk, role=role) for user in users],
+            batch_size=batch_size,
+            ignore_conflicts=True,
+        )
+
 # UserProfile model for role-based access control
 class UserProfile(models.Model):
     ROLE_CHOICES = [
@@ -36,18 +57,76 @@ class UserProfile(models.Model):
         ('Member', 'Member'),
     ]
     
-    user = models.OneToOneField(User, on_delete=models.CASCADE)
+    user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     role = models.CharField(max_length=10, choices=ROLE_CHOICES, default='Member')
+
+    objects = UserProfileManager()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._snapshot()
+        return instance
+
+    def refresh_from_db(self, using=None, fields=None, from_queryset=None):
+        super().refresh_from_db(using, fields, from_queryset)
+        self._snapshot(fields)
+
+    @classmethod
+    def tracked_fields(cls):
+        """Fields compared against their loaded values to find unsaved changes."""
+        return [field for field in cls._meta.concrete_fields if not field.primary_key]
+
+    def _snapshot(self, field_names=None):
+        # Deferred fields are left out rather than loaded just to be compared
+        fields = self.tracked_fields()
+        if field_names is not None and hasattr(self, '_loaded_values'):
+            fields = [field for field in fields if field.name in field_names or field.attname in field_names]
+        else:
+            self._loaded_values = {}
+        self._loaded_values.update(
+            (field.attname, self.__dict__[field.attname]) for field in fields if field.attname in self.__dict__
+        )
+
+    def changed_fields(self):
+        """
+        Names of the fields that differ from the values last loaded or saved.
+        Profiles that were never loaded from the database report every field.
+        """
+        loaded = getattr(self, '_loaded_values', None)
+        if loaded is None:
+            return [field.name for field in self.tracked_fields()]
+        return [
+            field.name for field in self.tracked_fields()
+            if field.attname in self.__dict__ and self.__dict__[field.attname] != loaded.get(field.attname)
+        ]
+
+    def save(self, *args, **kwargs):
+        # Loaded profiles write only the fields that changed, or nothing at all
+        if hasattr(self, '_loaded_values') and not args and not kwargs:
+            changed = self.changed_fields()
+            if not changed:
+                return
+            kwargs['update_fields'] = changed
+        super().save(*args, **kwargs)
+        self._snapshot(kwargs.get('update_fields'))
     
     def __str__(self):
         return f"{self.user.username} - {self.role}"
 
 # Signal to automatically create UserProfile when User is created
-@receiver(post_save, sender=User)
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
 def create_user_profile(sender, instance, created, **kwargs):
     if created:
         UserProfile.objects.create(user=instance)
 
-@receiver(post_save, sender=User)
-def save_user_profile(sender, instance, **kwargs):
-    instance.userprofile.save()
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def save_user_profile(sender, instance, created, **kwargs):
+    # Only a profile already loaded on this user can hold unsaved changes, so
+    # saves that never touched it (e.g. last_login on every login) cost nothing
+    related = UserProfile.user.field.remote_field
+    if created or not related.is_cached(instance):
+        return
+    profile = related.get_cached_value(instance)
+    if profile is not None and profile.changed_fields():
+        profile.save()
@@ -10,46 +10,42 @@ os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'LibraryProject.settings')
 django.setup()
 
 from relationship_app.models import Author, Book, Library, Librarian
+from relationship_app.queries import books_by_authors, books_in_libraries, librarians_for_libraries
 
 def query_all_books_by_author(author_name):
     """Query all books by a specific author."""
-    try:
-        author = Author.objects.get(name=author_name)
-        books = Book.objects.filter(author=author)
-        print(f"Books by {author_name}:")
-        for book in books:
-            print(f"- {book.title}")
-        return books
-    except Author.DoesNotExist:
+    books = books_by_authors([author_name]).get(author_name)
+    if books is None:
         print(f"Author '{author_name}' not found.")
         return []
+    print(f"Books by {author_name}:")
+    for book in books:
+        print(f"- {book.title}")
+    return books
 
 def list_all_books_in_library(library_name):
     """List all books in a library."""
-    try:
-        library = Library.objects.get(name=library_name)
-        books = library.books.all()
-        print(f"Books in {library_name}:")
-        for book in books:
-            print(f"- {book.title} by {book.author.name}")
-        return books
-    except Library.DoesNotExist:
+    books = books_in_libraries([library_name]).get(library_name)
+    if books is None:
         print(f"Library '{library_name}' not found.")
         return []
+    print(f"Books in {library_name}:")
+    for book in books:
+        print(f"- {book.title} by {book.author.name}")
+    return books
 
 def retrieve_librarian_for_library(library_name):
     """Retrieve the librarian for a library."""
-    try:
-        library = Library.objects.get(name=library_name)
-        librarian = Librarian.objects.get(library=library)
-        print(f"Librarian for {library_name}: {librarian.name}")
-        return librarian
-    except Library.DoesNotExist:
+    librarians = librarians_for_libraries([library_name])
+    if library_name not in librarians:
         print(f"Library '{library_name}' not found.")
         return None
-    except Librarian.DoesNotExist:
+    librarian = librarians[library_name]
+    if librarian is None:
         print(f"No librarian assigned to {library_name}.")
         return None
+    print(f"Librarian for {library_name}: {librarian.name}")
+    return librarian
 
 if __name__ == "__main__":
     # Sample usage - these will work after creating some sample data
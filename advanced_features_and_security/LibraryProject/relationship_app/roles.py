@@ -0,0 +1,33 @@
+"""
+Role checks for the relationship_app role-based views.
+
+Roles live on UserProfile. With relationship_app.backends.ProfileModelBackend
+installed the profile is loaded together with request.user, so get_role()
+and everything built on it runs without a database query.
+"""
+from django.contrib.auth.decorators import user_passes_test
+from django.contrib.auth.mixins import UserPassesTestMixin
+from django.core.exceptions import ObjectDoesNotExist
+
+
+def get_role(user):
+    """Return the user's role, or None for anonymous users and users without a profile."""
+    if not user.is_authenticated:
+        return None
+    try:
+        return user.userprofile.role
+    except ObjectDoesNotExist:
+        return None
+
+
+def role_required(role):
+    """Decorator for function views: only users with `role` get through."""
+    return user_passes_test(lambda user: get_role(user) == role)
+
+
+class RoleRequiredMixin(UserPassesTestMixin):
+    """Class-based view counterpart of role_required; set `required_role`."""
+    required_role = None
+
+    def test_func(self):
+        return get_role(self.request.user) == self.required_role
@@ -0,0 +1,167 @@
+import copy
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.authentication import TokenAuthentication
+
+
+class TokenCache:
+    """
+    Bounded LRU cache of token key -> (user, token) with a time-to-live.
+
+    Entries live in an in-process OrderedDict guarded by a lock. When a
+    shared cache alias is configured, misses fall back to that cache before
+    the database, so several worker processes can share lookups.
+
+    With a shared cache, every entry is tagged with the generation counter
+    kept there, and invalidate() bumps it. A worker that finds an entry from
+    an older generation treats it as a miss, so deletions and deactivations
+    seen by one worker reach the others on their next request, for the cost
+    of one shared cache read per lookup.
+    """
+    key_prefix = 'api:token:'
+    generation_key = 'api:token-generation'
+
+    def __init__(self, max_entries=10000, ttl=300, shared_cache=None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.shared_cache_alias = shared_cache
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def shared_cache(self):
+        return caches[self.shared_cache_alias] if self.shared_cache_alias else None
+
+    def shared_key(self, key):
+        # Never put raw credentials into a shared cache key
+        return self.key_prefix + hashlib.sha256(key.encode()).hexdigest()
+
+    def generation(self):
+        """The shared generation counter; always 0 without a shared cache."""
+        shared_cache = self.shared_cache
+        if not shared_cache:
+            return 0
+        generation = shared_cache.get(self.generation_key)
+        if generation is None:
+            # Start from a fresh value so entries tagged before the counter
+            # was evicted can never match again
+            shared_cache.add(self.generation_key, time.time_ns(), None)
+            generation = shared_cache.get(self.generation_key, 0)
+        return generation
+
+    def get(self, key, generation=None):
+        """
+        The cached value for `key`, or None. Pass the generation read before
+        a lookup to set() along with its result.
+        """
+        if generation is None:
+            generation = self.generation()
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, entry_generation, value = entry
+                if expires_at > now and entry_generation == generation:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+
+        shared_cache = self.shared_cache
+        entry = shared_cache.get(self.shared_key(key)) if shared_cache else None
+        value = entry[1] if entry is not None and entry[0] == generation else None
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._store(key, value, generation, now)
+        return value
+
+    def set(self, key, value, generation=None):
+        """
+        Cache `value` under `generation`, which should be read before `value`
+        was looked up so an invalidation in between is not lost.
+        """
+        if generation is None:
+            generation = self.generation()
+        with self._lock:
+            self._store(key, value, generation, time.monotonic())
+        shared_cache = self.shared_cache
+        if shared_cache:
+            shared_cache.set(self.shared_key(key), (generation, value), self.ttl)
+
+    def _store(self, key, value, generation, now):
+        self._entries[key] = (now + self.ttl, generation, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+        shared_cache = self.shared_cache
+        if shared_cache and keys:
+            shared_cache.delete_many([self.shared_key(key) for key in keys])
+            try:
+                shared_cache.incr(self.generation_key)
+            except ValueError:
+                # Counter missing or evicted; any new value retires old entries
+                shared_cache.set(self.generation_key, time.time_ns(), None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+            }
+
+
+_cache_settings = getattr(settings, 'API_TOKEN_CACHE', {})
+token_cache = TokenCache(
+    max_entries=_cache_settings.get('MAX_ENTRIES', 10000),
+    ttl=_cache_settings.get('TTL', 300),
+    shared_cache=_cache_settings.get('SHARED_CACHE'),
+)
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    TokenAuthentication that remembers successful token -> user lookups in
+    `token_cache`, so authenticated requests skip the Token/User query.
+
+    Entries are dropped when the token is deleted or its user is saved
+    (see api.signals), in every worker when SHARED_CACHE is set, and expire
+    after API_TOKEN_CACHE['TTL'] seconds.
+    """
+    cache = token_cache
+
+    def authenticate_credentials(self, key):
+        generation = self.cache.generation()
+        cached = self.cache.get(key, generation)
+        if cached is None:
+            cached = super().authenticate_credentials(key)
+            self.cache.set(key, cached, generation)
+        user, token = cached
+        # Each request gets its own user object so per-request state such as
+        # permission caches does not leak between requests
+        return (copy.copy(user), token)
@@ -0,0 +1,73 @@
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend, OrderingFilter
+
+
+def prefix_range(field, prefix):
+    """
+    Match values starting with `prefix` as a `>= prefix AND < next` range.
+
+    Unlike `LIKE 'prefix%'`, a range comparison can always be answered from
+    a plain b-tree index on `field`. Matching is case-sensitive.
+    """
+    last = ord(prefix[-1])
+    if last == 0x10FFFF:
+        return Q(**{f'{field}__gte': prefix})
+    return Q(**{f'{field}__gte': prefix, f'{field}__lt': prefix[:-1] + chr(last + 1)})
+
+
+class BookFilterBackend(BaseFilterBackend):
+    """
+    Query-parameter filters for Book list endpoints. Each filter is backed by
+    an index on api.Book (see Book.Meta.indexes):
+
+    ?title=<exact>          ?title_prefix=<prefix>
+    ?author=<exact>         ?search=<prefix of title or author>
+    ?created_after=<ISO 8601 datetime>  ?created_before=<ISO 8601 datetime>
+    """
+    def parse_datetime_param(self, request, name):
+        value = request.query_params.get(name)
+        if not value:
+            return None
+        parsed = parse_datetime(value)
+        if parsed is None:
+            raise ValidationError({name: ['Enter a valid ISO 8601 datetime.']})
+        return parsed
+
+    def filter_queryset(self, request, queryset, view):
+        params = request.query_params
+        if params.get('title'):
+            queryset = queryset.filter(title=params['title'])
+        if params.get('title_prefix'):
+            queryset = queryset.filter(prefix_range('title', params['title_prefix']))
+        if params.get('author'):
+            queryset = queryset.filter(author=params['author'])
+        if params.get('search'):
+            queryset = queryset.filter(
+                prefix_range('title', params['search']) | prefix_range('author', params['search'])
+            )
+
+        created_after = self.parse_datetime_param(request, 'created_after')
+        if created_after is not None:
+            queryset = queryset.filter(created_at__gte=created_after)
+        created_before = self.parse_datetime_param(request, 'created_before')
+        if created_before is not None:
+            queryset = queryset.filter(created_at__lt=created_before)
+        return queryset
+
+
+class BookOrderingFilter(OrderingFilter):
+    """
+    OrderingFilter restricted to a single whitelisted key, with `id` added as
+    a tie-breaker in the same direction so every ordering matches an index
+    and stays stable for cursor pagination.
+    """
+    def get_ordering(self, request, queryset, view):
+        ordering = super().get_ordering(request, queryset, view)
+        if not ordering:
+            return ordering
+        key = ordering[0]
+        if key.lstrip('-') == 'id':
+            return (key,)
+        return (key, '-id' if key.startswith('-') else 'id')
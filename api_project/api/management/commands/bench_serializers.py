@@ -0,0 +1,54 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+
+from api.models import Book
+from api.serializers import BookRowSerializer, BookSerializer
+
+
+class Command(BaseCommand):
+    """
+    Compare rows/sec of BookSerializer against the BookRowSerializer fast path.
+
+    Books are seeded inside a transaction that is rolled back afterwards, so
+    the command can be run against a development database safely.
+    """
+    help = 'Benchmark BookSerializer against BookRowSerializer (rows/sec)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=10000, help='Number of books to seed')
+        parser.add_argument('--repeat', type=int, default=3, help='Runs per serializer; the best is reported')
+
+    def handle(self, *args, **options):
+        rows, repeat = options['rows'], options['repeat']
+        renderer = JSONRenderer()
+
+        def model_serializer():
+            return renderer.render(BookSerializer(Book.objects.all(), many=True).data)
+
+        def row_serializer():
+            row_serializer = BookRowSerializer()
+            return renderer.render(row_serializer.serialize(row_serializer.rows(Book.objects.all())))
+
+        with transaction.atomic():
+            Book.objects.bulk_create(
+                (Book(title=f'Benchmark Book {i}', author=f'Author {i % 500}') for i in range(rows)),
+                batch_size=1000,
+            )
+            results = {}
+            for name, func in (('BookSerializer', model_serializer), ('BookRowSerializer', row_serializer)):
+                best = min(self.time_once(func) for _ in range(repeat))
+                results[name] = rows / best
+                self.stdout.write(f'{name:<20} {best * 1000:9.1f} ms  {results[name]:12,.0f} rows/sec')
+            transaction.set_rollback(True)
+
+        speedup = results['BookRowSerializer'] / results['BookSerializer']
+        self.stdout.write(self.style.SUCCESS(f'Fast path speedup: {speedup:.1f}x'))
+
+    @staticmethod
+    def time_once(func):
+        start = time.perf_counter()
+        func()
+        return time.perf_counter() - start
@@ -0,0 +1,436 @@
+import base64
+import hashlib
+import heapq
+import itertools
+import json
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import transaction
+from django.db.models import Count, Max, Q, Subquery
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.generics import get_object_or_404
+from rest_framework.parsers import JSONParser
+from rest_framework.permissions import BasePermission
+from rest_framework.response import Response
+
+from .parsers import NDJSONParser
+from .renderers import CSVRenderer, NDJSONRenderer
+
+
+class RowSerializerMixin:
+    """
+    Serve `list()` and `retrieve()` through a row serializer (see
+    BookRowSerializer) instead of `serializer_class`.
+
+    Views opt in by setting `row_serializer_class`; writes keep using the
+    regular serializer and its validation. Object-level permissions are
+    checked against the model instance, which costs one extra query on
+    retrieve for views that have any.
+    """
+    row_serializer_class = None
+
+    def has_object_permissions(self):
+        """Whether any permission class overrides has_object_permission()."""
+        return any(
+            type(permission).has_object_permission is not BasePermission.has_object_permission
+            for permission in self.get_permissions()
+        )
+
+    def list(self, request, *args, **kwargs):
+        if self.row_serializer_class is None:
+            return super().list(request, *args, **kwargs)
+        row_serializer = self.row_serializer_class()
+        queryset = row_serializer.rows(self.filter_queryset(self.get_queryset()))
+
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(row_serializer.serialize(page))
+        return Response(row_serializer.serialize(queryset))
+
+    def retrieve(self, request, *args, **kwargs):
+        if self.row_serializer_class is None:
+            return super().retrieve(request, *args, **kwargs)
+        row_serializer = self.row_serializer_class()
+        queryset = row_serializer.rows(self.filter_queryset(self.get_queryset()))
+
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        # DRF's get_object_or_404 turns malformed lookups into 404 as well
+        row = get_object_or_404(queryset, **{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+        if self.has_object_permissions():
+            # Permissions may read model attributes, which the row does not have
+            self.get_object()
+        return Response(row_serializer.to_representation(row))
+
+
+INVALID_ID = {'id': ['A valid integer is required.']}
+
+
+def coerce_id(value):
+    """`value` as an int primary key, or None when it is not int-like."""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, int):
+        return value
+    if isinstance(value, str):
+        try:
+            return int(value)
+        except ValueError:
+            return None
+    return None
+
+
+class BulkModelMixin:
+    """
+    Batch create, update and delete through a single `bulk/` endpoint.
+
+    POST   bulk/  - JSON array (or NDJSON) of objects to create
+    PATCH  bulk/  - JSON array (or NDJSON) of objects with `id` to update
+    DELETE bulk/  - JSON array of ids (or objects with `id`) to delete
+
+    Every item is validated with the view's serializer before anything is
+    written, valid items are written with one bulk query, and the response
+    lists a per-item result in request order. Invalid items do not prevent
+    valid ones from being written.
+    """
+    max_batch_size = getattr(settings, 'API_MAX_BATCH_SIZE', 1000)
+    bulk_update_fields = None
+
+    def get_bulk_items(self, request):
+        items = request.data
+        if not isinstance(items, list):
+            raise ValidationError({'detail': 'Expected a list of items.'})
+        if len(items) > self.max_batch_size:
+            raise ValidationError({
+                'detail': f'Batch size {len(items)} exceeds the maximum of {self.max_batch_size}.'
+            })
+        return items
+
+    def bulk_response(self, results, success_status):
+        failed = any(result['status'] >= 400 for result in results)
+        return Response(
+            {'results': results},
+            status=status.HTTP_207_MULTI_STATUS if failed else success_status,
+        )
+
+    @action(detail=False, methods=['post'], url_path='bulk',
+            parser_classes=[JSONParser, NDJSONParser])
+    def bulk(self, request, *args, **kwargs):
+        items = self.get_bulk_items(request)
+        model = self.get_queryset().model
+
+        results = [None] * len(items)
+        pending = []
+        for index, item in enumerate(items):
+            serializer = self.get_serializer(data=item)
+            if serializer.is_valid():
+                pending.append((index, model(**serializer.validated_data)))
+            else:
+                results[index] = {'index': index, 'status': 400, 'errors': serializer.errors}
+
+        with transaction.atomic():
+            model.objects.bulk_create([obj for _, obj in pending])
+
+        for index, obj in pending:
+            results[index] = {'index': index, 'status': 201, 'data': self.get_serializer(obj).data}
+        return self.bulk_response(results, status.HTTP_201_CREATED)
+
+    @bulk.mapping.patch
+    def bulk_partial_update(self, request, *args, **kwargs):
+        items = self.get_bulk_items(request)
+        queryset = self.get_queryset()
+        model = queryset.model
+        ids = [coerce_id(item.get('id')) if isinstance(item, dict) else None for item in items]
+        instances = queryset.in_bulk([pk for pk in ids if pk is not None])
+
+        results = [None] * len(items)
+        pending = []
+        update_fields = set()
+        for index, (item, pk) in enumerate(zip(items, ids)):
+            if pk is None:
+                results[index] = {'index': index, 'status': 400, 'errors': INVALID_ID}
+                continue
+            instance = instances.get(pk)
+            if instance is None:
+                results[index] = {'index': index, 'status': 404, 'errors': {'id': ['Not found.']}}
+                continue
+            serializer = self.get_serializer(instance, data=item, partial=True)
+            if not serializer.is_valid():
+                results[index] = {'index': index, 'status': 400, 'errors': serializer.errors}
+                continue
+            for attr, value in serializer.validated_data.items():
+                setattr(instance, attr, value)
+            update_fields.update(serializer.validated_data)
+            pending.append((index, instance))
+
+        if pending:
+            # bulk_update() skips pre_save(), so auto_now fields are refreshed here
+            now = timezone.now()
+            for field in model._meta.concrete_fields:
+                if getattr(field, 'auto_now', False):
+                    update_fields.add(field.name)
+                    for _, instance in pending:
+                        setattr(instance, field.attname, now)
+            with transaction.atomic():
+                model.objects.bulk_update(
+                    [instance for _, instance in pending],
+                    self.bulk_update_fields or sorted(update_fields),
+                )
+
+        for index, instance in pending:
+            results[index] = {'index': index, 'status': 200, 'data': self.get_serializer(instance).data}
+        return self.bulk_response(results, status.HTTP_200_OK)
+
+    @bulk.mapping.delete
+    def bulk_destroy(self, request, *args, **kwargs):
+        items = self.get_bulk_items(request)
+        ids = [coerce_id(item.get('id') if isinstance(item, dict) else item) for item in items]
+        queryset = self.get_queryset()
+
+        existing = set(queryset.filter(pk__in=[pk for pk in ids if pk is not None])
+                       .values_list('pk', flat=True))
+        with transaction.atomic():
+            queryset.filter(pk__in=existing).delete()
+
+        results = []
+        for index, pk in enumerate(ids):
+            if pk is None:
+                results.append({'index': index, 'status': 400, 'errors': INVALID_ID})
+            elif pk in existing:
+                results.append({'index': index, 'status': 204, 'id': pk})
+            else:
+                results.append({'index': index, 'status': 404, 'id': pk, 'errors': {'id': ['Not found.']}})
+        return self.bulk_response(results, status.HTTP_200_OK)
+
+
+class StreamingExportMixin:
+    """
+    Stream the filtered queryset through `export/` as NDJSON or CSV.
+
+    Pick the format with `?format=ndjson|csv` or an Accept header. Rows are
+    read with `.iterator(chunk_size=...)` and serialized by
+    `row_serializer_class` one at a time, so memory use does not grow with
+    the size of the table.
+    """
+    export_chunk_size = getattr(settings, 'API_EXPORT_CHUNK_SIZE', 2000)
+    export_filename = 'export'
+
+    @action(detail=False, methods=['get'], renderer_classes=[NDJSONRenderer, CSVRenderer])
+    def export(self, request, *args, **kwargs):
+        renderer = request.accepted_renderer
+        row_serializer = self.row_serializer_class()
+        queryset = row_serializer.rows(self.filter_queryset(self.get_queryset()))
+        if not queryset.ordered:
+            queryset = queryset.order_by('pk')
+
+        rows = (
+            row_serializer.to_representation(row)
+            for row in queryset.iterator(chunk_size=self.export_chunk_size)
+        )
+        response = StreamingHttpResponse(
+            renderer.iter_render(rows, fields=row_serializer.field_names),
+            content_type=f'{renderer.media_type}; charset={renderer.charset}',
+        )
+        response['Content-Disposition'] = (
+            f'attachment; filename="{self.export_filename}.{renderer.format}"'
+        )
+        return response
+
+
+class ScalarSubquery(Subquery):
+    """An uncorrelated scalar subquery that aggregate() accepts next to aggregates."""
+    contains_aggregate = True
+
+
+class ConditionalGetMixin:
+    """
+    Answer `If-None-Match` / `If-Modified-Since` on list and retrieve with
+    304 Not Modified before anything is serialized.
+
+    Validators come from `last_modified_field`: the detail ETag is built from
+    the object's pk and timestamp, and the list ETag from MAX(timestamp) over
+    the unfiltered queryset, fetched with a single aggregate query. Filters
+    are deliberately ignored there: a row edited so that it leaves a filter
+    no longer counts towards the filtered MAX, but still moves the table's.
+    The request path, and so the filter, is part of the ETag. Deletions
+    are folded in from MAX(`tombstone_field`), as a subquery of that same
+    aggregate, when the view sets `tombstone_model`; otherwise COUNT is
+    added to the aggregate instead.
+    ETags also cover the request path and the negotiated media type, so
+    different pages and formats never share a validator.
+    """
+    last_modified_field = 'updated_at'
+    tombstone_model = None
+    tombstone_field = 'deleted_at'
+
+    def make_etag(self, request, *parts):
+        media_type = getattr(request, 'accepted_media_type', '')
+        payload = '|'.join(str(part) for part in (request.get_full_path(), media_type, *parts))
+        return quote_etag(hashlib.md5(payload.encode(), usedforsecurity=False).hexdigest())
+
+    def conditional_response(self, request, etag, last_modified, view_func, *args, **kwargs):
+        timestamp = int(last_modified.timestamp()) if last_modified else None
+        not_modified = get_conditional_response(request, etag=etag, last_modified=timestamp)
+        if not_modified is not None:
+            if not_modified.status_code == status.HTTP_304_NOT_MODIFIED:
+                not_modified['ETag'] = etag
+            return not_modified
+
+        response = view_func(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            response['ETag'] = etag
+            if timestamp is not None:
+                response['Last-Modified'] = http_date(timestamp)
+        return response
+
+    def list_validators(self, queryset):
+        """Return (last_modified, etag_parts) for the view's unfiltered queryset."""
+        if self.tombstone_model is None:
+            stats = queryset.aggregate(last_modified=Max(self.last_modified_field), count=Count('pk'))
+            return stats['last_modified'], (stats['last_modified'], stats['count'])
+
+        # The latest tombstone, read by the index on tombstone_field
+        tombstones = self.tombstone_model.objects.order_by(f'-{self.tombstone_field}')
+        stats = queryset.aggregate(
+            last_modified=Max(self.last_modified_field),
+            last_deleted=ScalarSubquery(tombstones.values(self.tombstone_field)[:1]),
+        )
+        last_modified, last_deleted = stats['last_modified'], stats['last_deleted']
+        if last_deleted is not None and (last_modified is None or last_deleted > last_modified):
+            last_modified = last_deleted
+        return last_modified, (last_modified,)
+
+    def list(self, request, *args, **kwargs):
+        last_modified, etag_parts = self.list_validators(self.get_queryset())
+        etag = self.make_etag(request, *etag_parts)
+        return self.conditional_response(
+            request, etag, last_modified, super().list, *args, **kwargs
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        lookup = {self.lookup_field: self.kwargs[lookup_url_kwarg]}
+        try:
+            last_modified = (
+                self.filter_queryset(self.get_queryset()).filter(**lookup)
+                .values_list(self.last_modified_field, flat=True).first()
+            )
+        except (TypeError, ValueError, DjangoValidationError):
+            # A malformed lookup value; super().retrieve() turns it into a 404
+            last_modified = None
+        if last_modified is None:
+            return super().retrieve(request, *args, **kwargs)
+        etag = self.make_etag(request, last_modified)
+        return self.conditional_response(
+            request, etag, last_modified, super().retrieve, *args, **kwargs
+        )
+
+
+class DeltaSyncMixin:
+    """
+    Incremental sync feed at `changes/?since=<cursor>`.
+
+    Returns rows created or updated after the cursor plus the ids of rows
+    deleted after it (from `tombstone_model`), ordered on
+    (timestamp, kind, id) so the returned cursor only ever moves forward.
+    Both streams are read with keyset range scans, so the cost of a sync
+    depends on how much changed rather than on the size of the table.
+    Omit `since` to start from the beginning.
+
+    Timestamps are set in save(), before the row's transaction commits, so
+    a row can become visible with a timestamp older than changes already
+    synced. Rows stamped within the last `sync_lag` seconds are therefore
+    held back until the next sync. Every change whose transaction commits
+    within `sync_lag` seconds of being stamped is delivered exactly once;
+    a transaction that takes longer than that may have its rows skipped.
+    """
+    last_modified_field = 'updated_at'
+    tombstone_model = None
+    tombstone_field = 'deleted_at'
+    tombstone_id_field = 'book_id'
+    sync_page_size = getattr(settings, 'API_SYNC_PAGE_SIZE', 500)
+    sync_lag = getattr(settings, 'API_SYNC_LAG', 5)
+
+    UPSERT, DELETE = 0, 1
+
+    @staticmethod
+    def encode_sync_cursor(position):
+        timestamp, kind, pk = position
+        payload = json.dumps([timestamp.isoformat(), kind, pk]).encode()
+        return base64.urlsafe_b64encode(payload).decode()
+
+    @staticmethod
+    def decode_sync_cursor(cursor):
+        try:
+            timestamp, kind, pk = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            return datetime.fromisoformat(timestamp), int(kind), int(pk)
+        except (TypeError, ValueError):
+            raise ValidationError({'since': ['Invalid cursor.']})
+
+    @staticmethod
+    def after(field, kind, position):
+        """Filter for rows of `kind` that sort after `position`."""
+        if position is None:
+            return Q()
+        timestamp, cursor_kind, pk = position
+        condition = Q(**{f'{field}__gt': timestamp})
+        if kind > cursor_kind:
+            condition |= Q(**{field: timestamp})
+        elif kind == cursor_kind:
+            condition |= Q(**{field: timestamp, 'pk__gt': pk})
+        return condition
+
+    @action(detail=False, methods=['get'])
+    def changes(self, request, *args, **kwargs):
+        since = request.query_params.get('since')
+        position = self.decode_sync_cursor(since) if since else None
+        limit = self.sync_page_size
+        # Rows stamped after this may still belong to uncommitted transactions
+        horizon = timezone.now() - timedelta(seconds=self.sync_lag)
+
+        row_serializer = self.row_serializer_class()
+        changed = (
+            row_serializer.rows(self.get_queryset())
+            .filter(self.after(self.last_modified_field, self.UPSERT, position))
+            .filter(**{f'{self.last_modified_field}__lte': horizon})
+            .order_by(self.last_modified_field, 'pk')[:limit + 1]
+        )
+        deleted = (
+            self.tombstone_model.objects
+            .filter(self.after(self.tombstone_field, self.DELETE, position))
+            .filter(**{f'{self.tombstone_field}__lte': horizon})
+            .order_by(self.tombstone_field, 'pk')
+            .values_list(self.tombstone_field, 'pk', self.tombstone_id_field)[:limit + 1]
+        )
+        stream = heapq.merge(
+            ((getattr(row, self.last_modified_field), self.UPSERT, row.id, row) for row in changed),
+            ((timestamp, self.DELETE, pk, object_id) for timestamp, pk, object_id in deleted),
+            key=lambda change: change[:3],
+        )
+        page = list(itertools.islice(stream, limit + 1))
+        has_more = len(page) > limit
+        page = page[:limit]
+
+        updated, deleted_ids = [], []
+        for timestamp, kind, pk, item in page:
+            if kind == self.UPSERT:
+                updated.append(row_serializer.to_representation(item))
+            else:
+                deleted_ids.append(item)
+        if page:
+            cursor = self.encode_sync_cursor(page[-1][:3])
+        else:
+            cursor = since
+        return Response({
+            'updated': updated,
+            'deleted': deleted_ids,
+            'cursor': cursor,
+            'has_more': has_more,
+        })
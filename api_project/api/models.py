@@ -1,11 +1,62 @@
-from django.db import models
+from django.db import models, router, transaction
 
 # Create your models here.
+class BookQuerySet(models.QuerySet):
+    def delete(self):
+        """
+        Delete the matched books, recording a tombstone for each one so
+        delta-sync clients learn about the deletion.
+        """
+        with transaction.atomic(using=self.db):
+            BookTombstone.objects.using(self.db).bulk_create(
+                BookTombstone(book_id=pk) for pk in self.values_list('pk', flat=True)
+            )
+            return super().delete()
+
+    delete.alters_data = True
+    delete.queryset_only = True
+
+
 class Book(models.Model):
     title = models.CharField(max_length=200)
     author = models.CharField(max_length=100)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = BookQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Serves the keyset ordering used by BookCursorPagination
+            models.Index(fields=['created_at', 'id'], name='api_book_created_id_idx'),
+            # Serves the `changes` delta-sync feed and MAX(updated_at) validators
+            models.Index(fields=['updated_at', 'id'], name='api_book_updated_id_idx'),
+            # Serve the filters and orderings in api.filters
+            models.Index(fields=['title', 'id'], name='api_book_title_id_idx'),
+            models.Index(fields=['author', 'created_at', 'id'], name='api_book_author_created_idx'),
+        ]
+
     def __str__(self):
         return f"{self.title} by {self.author}"
+
+    def delete(self, using=None, keep_parents=False):
+        using = using or router.db_for_write(self.__class__, instance=self)
+        with transaction.atomic(using=using):
+            BookTombstone.objects.using(using).create(book_id=self.pk)
+            return super().delete(using=using, keep_parents=keep_parents)
+
+
+class BookTombstone(models.Model):
+    """
+    Records the id of a deleted Book so the `changes` feed can report it.
+    """
+    book_id = models.BigIntegerField()
+    deleted_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['deleted_at', 'id'], name='api_tombstone_deleted_idx'),
+        ]
+
+    def __str__(self):
+        return f"Book {self.book_id} deleted at {self.deleted_at}"
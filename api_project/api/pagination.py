@@ -0,0 +1,18 @@
+from django.conf import settings
+from rest_framework.pagination import CursorPagination
+
+
+class BookCursorPagination(CursorPagination):
+    """
+    Keyset (cursor) pagination for Book list endpoints.
+
+    Rows are ordered on (created_at, id) and each page is fetched with a
+    `WHERE created_at > <cursor>` range scan on the matching index, so the
+    cost of a page does not depend on how deep into the catalog it is.
+    Cursors are opaque base64 tokens and no COUNT(*) query is issued.
+    Clients may ask for a smaller or larger page with `?page_size=`, capped
+    at API_MAX_PAGE_SIZE.
+    """
+    ordering = ('created_at', 'id')
+    page_size_query_param = 'page_size'
+    max_page_size = getattr(settings, 'API_MAX_PAGE_SIZE', 100)
@@ -0,0 +1,61 @@
+import csv
+import json
+
+from rest_framework.renderers import BaseRenderer
+
+
+class _EchoBuffer:
+    """File-like object whose write() returns the value instead of storing it."""
+    def write(self, value):
+        return value
+
+
+class NDJSONRenderer(BaseRenderer):
+    """
+    Renders a list of flat dicts as newline-delimited JSON.
+    `iter_render()` yields one encoded line per row for streaming responses.
+    """
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        rows = data if isinstance(data, list) else [data]
+        return b''.join(self.iter_render(rows))
+
+    def iter_render(self, rows, fields=None):
+        dumps = json.dumps
+        for row in rows:
+            yield (dumps(row, ensure_ascii=False) + '\n').encode(self.charset)
+
+
+class CSVRenderer(BaseRenderer):
+    """
+    Renders a list of flat dicts as CSV with a header row.
+    `iter_render()` yields one encoded line per row for streaming responses.
+    """
+    media_type = 'text/csv'
+    format = 'csv'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        rows = data if isinstance(data, list) else [data]
+        return b''.join(self.iter_render(rows))
+
+    def iter_render(self, rows, fields=None):
+        writer = csv.writer(_EchoBuffer())
+        rows = iter(rows)
+        if fields is None:
+            first = next(rows, None)
+            if first is None:
+                return
+            fields = list(first)
+            rows = _prepend(first, rows)
+        yield writer.writerow(fields).encode(self.charset)
+        for row in rows:
+            yield writer.writerow([row.get(field) for field in fields]).encode(self.charset)
+
+
+def _prepend(first, rows):
+    yield first
+    yield from rows
@@ -1,4 +1,5 @@
-from rest_framework import serializers
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
 from .models import Book
 
 class BookSerializer(serializers.ModelSerializer):
@@ -10,3 +11,57 @@ class BookSerializer(serializers.ModelSerializer):
         model = Book
         fields = ['id', 'title', 'author', 'created_at', 'updated_at']
         read_only_fields = ['id', 'created_at', 'updated_at']
+
+
+def _compile_field(field):
+    """
+    Return a converter for one serializer field, or None when the raw
+    database value is already the representation (ints and strings).
+    """
+    if isinstance(field, (serializers.CharField, serializers.IntegerField)):
+        return None
+    if isinstance(field, serializers.DateTimeField):
+        output_format = getattr(field, 'format', api_settings.DATETIME_FORMAT)
+        if output_format is not None and output_format.lower() == ISO_8601:
+            field_timezone = field.default_timezone()
+
+            def to_iso(value):
+                if field_timezone is not None:
+                    value = value.astimezone(field_timezone)
+                value = value.isoformat()
+                if value.endswith('+00:00'):
+                    value = value[:-6] + 'Z'
+                return value
+            return to_iso
+    return field.to_representation
+
+
+class BookRowSerializer:
+    """
+    Read-only fast path for Book list and retrieve responses.
+
+    Rows are fetched with `values_list()` instead of as model instances, and
+    each row is converted through a field plan compiled once from
+    BookSerializer, so the output is identical to BookSerializer's without
+    per-row field lookups.
+    """
+    serializer_class = BookSerializer
+
+    def __init__(self):
+        fields = self.serializer_class().fields
+        self.field_names = tuple(fields)
+        self.plan = tuple(_compile_field(field) for field in fields.values())
+
+    def rows(self, queryset):
+        """Restrict a Book queryset to the serialized columns."""
+        return queryset.values_list(*self.field_names, named=True)
+
+    def to_representation(self, row):
+        return dict(zip(self.field_names, [
+            value if convert is None or value is None else convert(value)
+            for convert, value in zip(self.plan, row)
+        ]))
+
+    def serialize(self, rows):
+        to_representation = self.to_representation
+        return [to_representation(row) for row in rows]
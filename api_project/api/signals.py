@@ -0,0 +1,24 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from .authentication import token_cache
+
+
+@receiver(post_delete, sender=Token)
+def invalidate_deleted_token(sender, instance, **kwargs):
+    """Stop accepting a token as soon as it is deleted."""
+    token_cache.invalidate(instance.key)
+
+
+@receiver(post_save, sender=get_user_model())
+def invalidate_user_tokens(sender, instance, created, update_fields=None, **kwargs):
+    """
+    Drop cached lookups for a user whenever the user changes, so
+    deactivation takes effect immediately. Login only touches last_login,
+    which does not affect authentication, so that save is ignored.
+    """
+    if created or (update_fields and set(update_fields) == {'last_login'}):
+        return
+    token_cache.invalidate(*Token.objects.filter(user=instance).values_list('key', flat=True))
@@ -1,3 +1,552 @@
-from django.test import TestCase
+import csv
+import json
+import re
+import tempfile
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+from rest_framework.permissions import BasePermission, IsAuthenticated
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory, APITestCase, force_authenticate
+
+from api_project import metrics
+from .authentication import token_cache
+from .models import Book, BookTombstone
+from .pagination import BookCursorPagination
+from .serializers import BookRowSerializer, BookSerializer
+from .throttling import FileBucketStore, get_bucket_store, take_token
+from .views import BookViewSet
+
+
+class BookAPITestCase(APITestCase):
+    """
+    Base test case that creates an authenticated API client.
+    """
+    def setUp(self):
+        token_cache.clear()
+        get_bucket_store().clear()
+        self.user = User.objects.create_user(username='tester', password='secret-pass-123')
+        self.token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+
+class BookPaginationTests(BookAPITestCase):
+    """
+    Tests for keyset pagination on the Book list endpoints.
+    """
+    def setUp(self):
+        super().setUp()
+        Book.objects.bulk_create(
+            Book(title=f'Book {i}', author=f'Author {i % 3}') for i in range(12)
+        )
+
+    def collect_pages(self, url):
+        ids = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            ids.extend(book['id'] for book in response.data['results'])
+            url = response.data['next']
+        return ids
+
+    def test_cursor_pages_cover_every_book_once(self):
+        ids = self.collect_pages('/api/books/?page_size=5')
+        self.assertEqual(sorted(ids), sorted(Book.objects.values_list('id', flat=True)))
+        self.assertEqual(len(ids), len(set(ids)))
+
+    def test_viewset_list_is_paginated(self):
+        response = self.client.get('/api/books_all/?page_size=4')
+        self.assertEqual(len(response.data['results']), 4)
+        self.assertIsNotNone(response.data['next'])
+        self.assertNotIn('count', response.data)
+
+    def test_page_size_is_capped(self):
+        Book.objects.bulk_create(Book(title='Extra', author='Extra') for _ in range(600))
+        response = self.client.get('/api/books/?page_size=100000')
+        self.assertEqual(len(response.data['results']), 500)
+
+    def test_paginator_issues_no_count_query(self):
+        request = Request(APIRequestFactory().get('/api/books/', {'page_size': 5}))
+        with CaptureQueriesContext(connection) as ctx:
+            page = BookCursorPagination().paginate_queryset(Book.objects.all(), request)
+        self.assertEqual(len(page), 5)
+        self.assertEqual(len(ctx.captured_queries), 1)
+        self.assertNotIn('COUNT(', ctx.captured_queries[0]['sql'].upper())
+
+
+class BookRowSerializerTests(BookAPITestCase):
+    """
+    Tests that the fast read path matches BookSerializer output.
+    """
+    def setUp(self):
+        super().setUp()
+        self.book = Book.objects.create(title='Fast Path', author='Row Serializer')
+
+    def test_matches_model_serializer(self):
+        row_serializer = BookRowSerializer()
+        rows = row_serializer.serialize(row_serializer.rows(Book.objects.all()))
+        expected = BookSerializer(Book.objects.all(), many=True).data
+        self.assertEqual(rows, [dict(item) for item in expected])
+
+    def test_retrieve_uses_fast_path(self):
+        response = self.client.get(f'/api/books_all/{self.book.pk}/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, dict(BookSerializer(self.book).data))
+
+    def test_retrieve_missing_book(self):
+        response = self.client.get('/api/books_all/999999/')
+        self.assertEqual(response.status_code, 404)
+
+    def test_object_permissions_see_the_instance(self):
+        class IsBook(BasePermission):
+            def has_object_permission(self, request, view, obj):
+                return isinstance(obj, Book)
+
+        view = BookViewSet.as_view({'get': 'retrieve'}, permission_classes=[IsAuthenticated, IsBook])
+        request = APIRequestFactory().get(f'/api/books_all/{self.book.pk}/')
+        force_authenticate(request, user=self.user)
+        response = view(request, pk=self.book.pk)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['title'], 'Fast Path')
+
+
+class BookBulkTests(BookAPITestCase):
+    """
+    Tests for the batch create/update/delete endpoint on BookViewSet.
+    """
+    url = '/api/books_all/bulk/'
+
+    def test_bulk_create_json(self):
+        payload = [{'title': f'Bulk {i}', 'author': 'Batch'} for i in range(5)]
+        response = self.client.post(self.url, payload, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(Book.objects.count(), 5)
+        self.assertTrue(all(result['data']['id'] for result in response.data['results']))
+
+    def test_bulk_create_ndjson_reports_invalid_items(self):
+        body = b'{"title": "Good", "author": "Batch"}\n\n{"author": "No Title"}\n'
+        response = self.client.post(self.url, body, content_type='application/x-ndjson')
+        self.assertEqual(response.status_code, 207)
+        statuses = [result['status'] for result in response.data['results']]
+        self.assertEqual(statuses, [201, 400])
+        self.assertEqual(Book.objects.count(), 1)
+
+    def test_bulk_update(self):
+        book = Book.objects.create(title='Old', author='Author')
+        response = self.client.patch(
+            self.url, [{'id': book.pk, 'title': 'New'}, {'id': 999999, 'title': 'Missing'}], format='json'
+        )
+        self.assertEqual(response.status_code, 207)
+        book.refresh_from_db()
+        self.assertEqual(book.title, 'New')
+        self.assertEqual([r['status'] for r in response.data['results']], [200, 404])
+
+    def test_bulk_update_rejects_malformed_ids(self):
+        book = Book.objects.create(title='Old', author='Author')
+        payload = [{'id': [book.pk], 'title': 'List'}, {'id': 'abc'}, {'title': 'No id'}, 'x',
+                   {'id': str(book.pk), 'title': 'New'}]
+        response = self.client.patch(self.url, payload, format='json')
+        self.assertEqual(response.status_code, 207)
+        self.assertEqual([r['status'] for r in response.data['results']], [400, 400, 400, 400, 200])
+        book.refresh_from_db()
+        self.assertEqual(book.title, 'New')
+
+    def test_bulk_delete_rejects_malformed_ids(self):
+        book = Book.objects.create(title='Del', author='Batch')
+        response = self.client.delete(self.url, {'ids': [[1, 2]]}, format='json')
+        self.assertEqual(response.status_code, 400)
+        response = self.client.delete(self.url, [[book.pk], {'id': {'pk': 1}}, book.pk], format='json')
+        self.assertEqual(response.status_code, 207)
+        self.assertEqual([r['status'] for r in response.data['results']], [400, 400, 204])
+
+    def test_bulk_delete_single_query(self):
+        books = Book.objects.bulk_create(Book(title=f'Del {i}', author='Batch') for i in range(3))
+        ids = [book.pk for book in books]
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.delete(self.url, ids, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(Book.objects.filter(pk__in=ids).exists())
+        deletes = [q for q in ctx.captured_queries if q['sql'].startswith('DELETE')]
+        self.assertEqual(len(deletes), 1)
+
+    def test_batch_size_limit(self):
+        payload = [{'title': 'Too many', 'author': 'Batch'}] * 1001
+        response = self.client.post(self.url, payload, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(Book.objects.count(), 0)
+
+
+class BookExportTests(BookAPITestCase):
+    """
+    Tests for the streaming NDJSON/CSV export endpoint.
+    """
+    url = '/api/books_all/export/'
+
+    def setUp(self):
+        super().setUp()
+        Book.objects.bulk_create(Book(title=f'Export {i}', author='Streamer') for i in range(3))
+
+    def test_ndjson_export(self):
+        response = self.client.get(self.url, {'format': 'ndjson'})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual([json.loads(line)['title'] for line in lines], ['Export 0', 'Export 1', 'Export 2'])
+
+    def test_csv_export(self):
+        response = self.client.get(self.url, HTTP_ACCEPT='text/csv')
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        rows = list(csv.reader(b''.join(response.streaming_content).decode().splitlines()))
+        self.assertEqual(rows[0], ['id', 'title', 'author', 'created_at', 'updated_at'])
+        self.assertEqual(len(rows), 4)
+
+    def test_export_requires_authentication(self):
+        self.client.credentials()
+        response = self.client.get(self.url, {'format': 'ndjson'})
+        self.assertEqual(response.status_code, 401)
+
+
+class CachedTokenAuthenticationTests(BookAPITestCase):
+    """
+    Tests for the cached token -> user lookup.
+    """
+    url = '/api/books/'
+
+    def test_repeat_requests_skip_token_query(self):
+        self.client.get(self.url)
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(any('authtoken_token' in q['sql'] for q in ctx.captured_queries))
+        self.assertEqual(token_cache.stats()['hits'], 1)
+
+    def test_deleted_token_is_rejected(self):
+        self.client.get(self.url)
+        self.token.delete()
+        self.assertEqual(self.client.get(self.url).status_code, 401)
+
+    def test_deactivated_user_is_rejected(self):
+        self.client.get(self.url)
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.client.get(self.url).status_code, 401)
+
+    def test_invalidation_reaches_other_workers(self):
+        # token_cache plays the worker that handles the change; `other`
+        # already holds both users' tokens in its in-process LRU
+        other_user = User.objects.create_user(username='other', password='secret-pass-123')
+        other_token = Token.objects.create(user=other_user)
+        other = token_cache.__class__(ttl=60, shared_cache='default')
+        with mock.patch.object(token_cache, 'shared_cache_alias', 'default'):
+            for token in (self.token, other_token):
+                other.set(token.key, (token.user, token))
+            key = self.token.key
+            self.assertIsNotNone(other.get(key))
+
+            self.token.delete()
+            self.assertIsNone(other.get(key))
+
+            other.set(other_token.key, (other_user, other_token))
+            other_user.is_active = False
+            other_user.save()
+            self.assertIsNone(other.get(other_token.key))
+        caches['default'].clear()
+
+    def test_cache_is_bounded(self):
+        cache = token_cache.__class__(max_entries=2, ttl=60)
+        for key in 'abc':
+            cache.set(key, key)
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(cache.get('c'), 'c')
+        self.assertEqual(cache.stats()['evictions'], 1)
+
+
+class ConditionalGetTests(BookAPITestCase):
+    """
+    Tests for ETag / Last-Modified handling on Book endpoints.
+    """
+    def setUp(self):
+        super().setUp()
+        self.book = Book.objects.create(title='Cached', author='Validator')
+
+    def test_list_not_modified(self):
+        response = self.client.get('/api/books_all/')
+        etag = response['ETag']
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get('/api/books_all/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        # MAX(updated_at) over books, with the latest tombstone as a subquery
+        self.assertEqual(len(ctx.captured_queries), 1)
+
+    def test_list_etag_changes_on_update_and_delete(self):
+        etag = self.client.get('/api/books/')['ETag']
+        Book.objects.create(title='Another', author='Validator')
+        self.assertEqual(self.client.get('/api/books/', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+        etag = self.client.get('/api/books/')['ETag']
+        self.book.delete()
+        self.assertEqual(self.client.get('/api/books/', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_filtered_list_etag_changes_when_a_row_leaves_the_filter(self):
+        book = Book.objects.create(title='Django A', author='Validator')
+        Book.objects.create(title='Django B', author='Validator')
+        url = '/api/books_all/'
+        etag = self.client.get(url, {'title_prefix': 'Django'})['ETag']
+        book.title = 'Python A'
+        book.save()
+        response = self.client.get(url, {'title_prefix': 'Django'}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([item['title'] for item in response.data['results']], ['Django B'])
+
+    def test_list_etag_changes_when_last_book_is_deleted(self):
+        Book.objects.all().delete()
+        etag = self.client.get('/api/books_all/')['ETag']
+        Book.objects.create(title='Short-lived', author='Validator').delete()
+        self.assertEqual(self.client.get('/api/books_all/', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_retrieve_if_modified_since(self):
+        url = f'/api/books_all/{self.book.pk}/'
+        response = self.client.get(url)
+        last_modified = response['Last-Modified']
+        self.assertEqual(self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified).status_code, 304)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+
+    def test_retrieve_etag_changes_on_update(self):
+        url = f'/api/books_all/{self.book.pk}/'
+        etag = self.client.get(url)['ETag']
+        self.client.patch(url, {'title': 'Changed'}, format='json')
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_retrieve_malformed_pk(self):
+        self.assertEqual(self.client.get('/api/books_all/abc/').status_code, 404)
+        self.assertEqual(self.client.get('/api/books/abc/').status_code, 404)
+
+
+class DeltaSyncTests(BookAPITestCase):
+    """
+    Tests for the `changes` delta-sync feed and deletion tombstones.
+    """
+    url = '/api/books_all/changes/'
+
+    def setUp(self):
+        super().setUp()
+        patcher = mock.patch.object(BookViewSet, 'sync_lag', 0)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def sync(self, cursor=None):
+        params = {'since': cursor} if cursor else {}
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_initial_sync_then_only_changes(self):
+        first = Book.objects.create(title='First', author='Sync')
+        second = Book.objects.create(title='Second', author='Sync')
+        data = self.sync()
+        self.assertEqual([book['id'] for book in data['updated']], [first.pk, second.pk])
+
+        self.assertEqual(self.sync(data['cursor'])['updated'], [])
+
+        first.title = 'First (edited)'
+        first.save()
+        second_id = second.pk
+        second.delete()
+        data = self.sync(data['cursor'])
+        self.assertEqual([book['title'] for book in data['updated']], ['First (edited)'])
+        self.assertEqual(data['deleted'], [second_id])
+
+    def test_bulk_delete_records_tombstones(self):
+        books = Book.objects.bulk_create(Book(title=f'Gone {i}', author='Sync') for i in range(3))
+        Book.objects.filter(pk__in=[book.pk for book in books]).delete()
+        self.assertEqual(
+            sorted(BookTombstone.objects.values_list('book_id', flat=True)),
+            sorted(book.pk for book in books),
+        )
+
+    def test_paging_through_changes(self):
+        Book.objects.bulk_create(Book(title=f'Page {i}', author='Sync') for i in range(5))
+        Book.objects.filter(title='Page 0').delete()
+        seen_updated, seen_deleted, cursor = [], [], None
+        with mock.patch.object(BookViewSet, 'sync_page_size', 2):
+            while True:
+                data = self.sync(cursor)
+                self.assertLessEqual(len(data['updated']) + len(data['deleted']), 2)
+                seen_updated += [book['title'] for book in data['updated']]
+                seen_deleted += data['deleted']
+                cursor = data['cursor']
+                if not data['has_more']:
+                    break
+        self.assertEqual(len(seen_updated), 4)
+        self.assertEqual(len(seen_deleted), 1)
+
+    def test_recent_changes_wait_for_the_lag(self):
+        now = timezone.now()
+        for title, age in (('Synced', 60), ('Committed late', 3), ('New', 0)):
+            book = Book.objects.create(title=title, author='Sync')
+            Book.objects.filter(pk=book.pk).update(updated_at=now - timedelta(seconds=age))
+        lag = mock.patch.object(BookViewSet, 'sync_lag', 5)
+        with lag, mock.patch('django.utils.timezone.now', return_value=now):
+            data = self.sync()
+        self.assertEqual([book['title'] for book in data['updated']], ['Synced'])
+        # 'Committed late' is older than a change synced in between would be,
+        # but it is still delivered once the lag has passed
+        later = now + timedelta(seconds=10)
+        with lag, mock.patch('django.utils.timezone.now', return_value=later):
+            data = self.sync(data['cursor'])
+        self.assertEqual([book['title'] for book in data['updated']], ['Committed late', 'New'])
+
+    def test_invalid_cursor(self):
+        response = self.client.get(self.url, {'since': 'not-a-cursor'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_list_etag_changes_on_delete_without_count(self):
+        book = Book.objects.create(title='Tracked', author='Sync')
+        etag = self.client.get('/api/books/')['ETag']
+        book.delete()
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get('/api/books/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(any('COUNT(' in q['sql'].upper() for q in ctx.captured_queries))
+
+
+class BookFilterTests(BookAPITestCase):
+    """
+    Tests for filtering/ordering on BookViewSet and the indexes behind them.
+    """
+    url = '/api/books_all/'
+
+    def setUp(self):
+        super().setUp()
+        Book.objects.bulk_create([
+            Book(title='Django for APIs', author='William Vincent'),
+            Book(title='Django for Beginners', author='William Vincent'),
+            Book(title='Fluent Python', author='Luciano Ramalho'),
+        ])
+
+    def titles(self, params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200)
+        return [book['title'] for book in response.data['results']]
+
+    def test_filters(self):
+        self.assertEqual(self.titles({'title': 'Fluent Python'}), ['Fluent Python'])
+        self.assertEqual(len(self.titles({'title_prefix': 'Django'})), 2)
+        self.assertEqual(len(self.titles({'author': 'William Vincent'})), 2)
+        self.assertEqual(self.titles({'search': 'Luc'}), ['Fluent Python'])
+        self.assertEqual(self.titles({'created_before': '2000-01-01T00:00:00Z'}), [])
+
+    def test_ordering_whitelist(self):
+        self.assertEqual(self.titles({'ordering': '-title'})[0], 'Fluent Python')
+        # Unknown keys fall back to the default (created_at, id) ordering
+        self.assertEqual(self.titles({'ordering': 'author'})[0], 'Django for APIs')
+
+    def test_invalid_datetime(self):
+        response = self.client.get(self.url, {'created_after': 'yesterday'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_every_supported_query_uses_an_index(self):
+        supported = [
+            {},
+            {'ordering': 'title'},
+            {'ordering': '-updated_at'},
+            {'title': 'Fluent Python'},
+            {'title_prefix': 'Django', 'ordering': 'title'},
+            {'author': 'William Vincent'},
+            {'search': 'Dj'},
+            {'created_after': '2000-01-01T00:00:00Z', 'created_before': '2100-01-01T00:00:00Z'},
+        ]
+        for params in supported:
+            with self.subTest(params=params):
+                with CaptureQueriesContext(connection) as ctx:
+                    self.client.get(self.url, params)
+                book_queries = [
+                    q['sql'] for q in ctx.captured_queries
+                    if q['sql'].startswith('SELECT') and '"api_book"' in q['sql']
+                ]
+                self.assertTrue(book_queries)
+                for sql in book_queries:
+                    with connection.cursor() as cursor:
+                        cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+                        plan = [row[-1] for row in cursor.fetchall()]
+                    full_scans = [step for step in plan if step.strip() == 'SCAN api_book']
+                    self.assertFalse(full_scans, f'{sql}\n{plan}')
+
+
+class ThrottlingTests(BookAPITestCase):
+    """
+    Tests for the token-bucket throttles and their counter stores.
+    """
+    def test_auth_token_endpoint_is_throttled(self):
+        # Freeze the bucket clock: ten password checks can outlast the 6s refill
+        with mock.patch('api.throttling.time.monotonic', return_value=1000.0):
+            for _ in range(10):
+                response = self.client.post('/api/auth/token/', {'username': 'tester', 'password': 'wrong'})
+                self.assertEqual(response.status_code, 400)
+            response = self.client.post('/api/auth/token/', {'username': 'tester', 'password': 'wrong'})
+        self.assertEqual(response.status_code, 429)
+        self.assertGreaterEqual(int(response['Retry-After']), 1)
+
+    def test_bucket_refills_over_time(self):
+        state, allowed, _ = take_token(None, 1, 1.0, now=100.0)
+        self.assertTrue(allowed)
+        state, allowed, retry_after = take_token(state, 1, 1.0, now=100.5)
+        self.assertFalse(allowed)
+        self.assertAlmostEqual(retry_after, 0.5)
+        _, allowed, _ = take_token(state, 1, 1.0, now=101.0)
+        self.assertTrue(allowed)
+
+    def test_file_store_shares_counters(self):
+        with tempfile.TemporaryDirectory() as directory:
+            first, second = FileBucketStore(directory), FileBucketStore(directory)
+            self.assertTrue(first.consume('key', 2, 0.001)[0])
+            self.assertTrue(second.consume('key', 2, 0.001)[0])
+            self.assertFalse(first.consume('key', 2, 0.001)[0])
+
+
+@override_settings(REQUEST_METRICS={'TOKEN': 'scrape-token'})
+class RequestMetricsTests(BookAPITestCase):
+    """
+    Tests for per-view request metrics on the API endpoints.
+    """
+    def setUp(self):
+        super().setUp()
+        metrics.reset()
+
+    def scrape(self):
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer scrape-token')
+        response = self.client.get('/metrics/')
+        self.assertEqual(response.status_code, 200)
+        return response.content.decode()
+
+    def test_endpoint_needs_the_token(self):
+        self.client.credentials()
+        self.assertEqual(self.client.get('/metrics/').status_code, 403)
+
+    def test_export_queries_are_measured(self):
+        Book.objects.bulk_create(Book(title=f'Streamed {i}', author='Someone') for i in range(10))
+        response = self.client.get('/api/books_all/export/', {'format': 'ndjson'})
+        b''.join(response.streaming_content)
+        text = self.scrape()
+        sql_count = float(re.search(r'django_http_db_queries_sum\{view="book_all-export"\} (\S+)', text)[1])
+        # The token lookup and the export SELECT
+        self.assertGreaterEqual(sql_count, 2)
+
+    def test_viewset_requests_are_labelled_by_route(self):
+        Book.objects.create(title='Metered', author='Someone')
+        response = self.client.get('/api/books_all/')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('db;dur=', response['Server-Timing'])
+        self.client.get('/api/books/')
+
+        text = self.scrape()
+        self.assertIn('django_http_requests_total{method="GET",status="200",view="book_all-list"} 1', text)
+        self.assertIn('django_http_requests_total{method="GET",status="200",view="book-list"} 1', text)
+        self.assertIn('django_http_db_queries_count{view="book_all-list"} 1', text)
+        self.assertIn('# TYPE django_http_request_duration_seconds histogram', text)
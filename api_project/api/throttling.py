@@ -0,0 +1,177 @@
+import hashlib
+import math
+import os
+import struct
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.module_loading import import_string
+from rest_framework.throttling import SimpleRateThrottle
+
+# take_token() and the bucket stores are also in the advanced_features_and_security
+# project's bookshelf/ratelimit.py. The projects are deployed separately and share
+# no package, so a change to one copy must be made to both.
+
+
+def take_token(state, capacity, refill_rate, now):
+    """
+    Apply one request to a token bucket.
+
+    `state` is (tokens, last_update) or None for a full bucket. Returns
+    (new_state, allowed, retry_after_seconds).
+    """
+    tokens, updated = state if state is not None else (capacity, now)
+    tokens = min(capacity, tokens + (now - updated) * refill_rate)
+    if tokens >= 1:
+        return (tokens - 1, now), True, None
+    return (tokens, now), False, (1 - tokens) / refill_rate
+
+
+class MemoryBucketStore:
+    """
+    Token buckets in a bounded in-process dict. Fast, but each worker
+    process keeps its own counters.
+    """
+    def __init__(self, max_keys=100000):
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def consume(self, key, capacity, refill_rate):
+        with self._lock:
+            state, allowed, retry_after = take_token(
+                self._buckets.get(key), capacity, refill_rate, time.monotonic()
+            )
+            self._buckets[key] = state
+            self._buckets.move_to_end(key)
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return allowed, retry_after
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+
+
+class CacheBucketStore:
+    """
+    Token buckets in a Django cache (e.g. local-memory or Memcached).
+    Reads and writes are not atomic, so concurrent requests for the same
+    key may occasionally both be allowed.
+    """
+    key_prefix = 'throttle:bucket:'
+
+    def __init__(self, alias='default'):
+        self.alias = alias
+
+    def consume(self, key, capacity, refill_rate):
+        cache = caches[self.alias]
+        cache_key = self.key_prefix + key
+        state, allowed, retry_after = take_token(
+            cache.get(cache_key), capacity, refill_rate, time.time()
+        )
+        # Once the bucket would be full again the entry carries no information
+        cache.set(cache_key, state, math.ceil(capacity / refill_rate) + 1)
+        return allowed, retry_after
+
+    def clear(self):
+        caches[self.alias].clear()
+
+
+class FileBucketStore:
+    """
+    Token buckets in small files under `directory`, one per key, updated
+    under an exclusive `flock`. Counters are shared by every process on the
+    host that uses the same directory.
+    """
+    record = struct.Struct('dd')
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def path_for(self, key):
+        return os.path.join(self.directory, hashlib.sha1(key.encode()).hexdigest())
+
+    def consume(self, key, capacity, refill_rate):
+        import fcntl
+
+        fd = os.open(self.path_for(key), os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            data = os.pread(fd, self.record.size, 0)
+            previous = self.record.unpack(data) if len(data) == self.record.size else None
+            state, allowed, retry_after = take_token(previous, capacity, refill_rate, time.time())
+            os.pwrite(fd, self.record.pack(*state), 0)
+        finally:
+            os.close(fd)
+        return allowed, retry_after
+
+    def clear(self):
+        for name in os.listdir(self.directory):
+            os.remove(os.path.join(self.directory, name))
+
+
+@lru_cache(maxsize=None)
+def get_bucket_store():
+    """Return the store configured by API_THROTTLE_STORE."""
+    config = getattr(settings, 'API_THROTTLE_STORE', {})
+    backend = import_string(config.get('BACKEND', 'api.throttling.MemoryBucketStore'))
+    return backend(**config.get('OPTIONS', {}))
+
+
+class TokenBucketThrottle(SimpleRateThrottle):
+    """
+    SimpleRateThrottle variant backed by a token bucket.
+
+    A rate of 'N/period' allows bursts of N requests and refills at
+    N/period tokens per second. Each request costs a single bucket update,
+    instead of SimpleRateThrottle's list of request timestamps.
+    """
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+        allowed, self.retry_after = get_bucket_store().consume(
+            self.key, self.num_requests, self.num_requests / self.duration
+        )
+        return allowed
+
+    def wait(self):
+        return self.retry_after
+
+
+class UserTokenBucketThrottle(TokenBucketThrottle):
+    """Throttle authenticated requests per API token (or per user)."""
+    scope = 'user'
+
+    def get_cache_key(self, request, view):
+        if not request.user or not request.user.is_authenticated:
+            return None
+        auth_key = getattr(request.auth, 'key', None)
+        ident = hashlib.sha1(auth_key.encode()).hexdigest() if auth_key else request.user.pk
+        return self.cache_format % {'scope': self.scope, 'ident': ident}
+
+
+class AnonTokenBucketThrottle(TokenBucketThrottle):
+    """Throttle unauthenticated requests per client IP."""
+    scope = 'anon'
+
+    def get_cache_key(self, request, view):
+        if request.user and request.user.is_authenticated:
+            return None
+        return self.cache_format % {'scope': self.scope, 'ident': self.get_ident(request)}
+
+
+class AuthTokenThrottle(TokenBucketThrottle):
+    """Throttle token requests (login attempts) per client IP."""
+    scope = 'auth_token'
+
+    def get_cache_key(self, request, view):
+        return self.cache_format % {'scope': self.scope, 'ident': self.get_ident(request)}
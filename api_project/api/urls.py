@@ -1,6 +1,7 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from rest_framework.authtoken.views import obtain_auth_token
+from rest_framework.authtoken.views import ObtainAuthToken
+from .throttling import AuthTokenThrottle
 from .views import BookList, BookViewSet
 
 # Create a router and register our ViewSet with it
@@ -16,5 +17,7 @@ urlpatterns = [
     path('', include(router.urls)),
     
     # Authentication endpoint for obtaining tokens
-    path('auth/token/', obtain_auth_token, name='api_token_auth'),
+    # Throttled per client IP to slow down password guessing
+    path('auth/token/', ObtainAuthToken.as_view(throttle_classes=[AuthTokenThrottle]),
+         name='api_token_auth'),
 ]
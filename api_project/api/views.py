@@ -1,25 +1,52 @@
 from rest_framework import generics, viewsets
 from rest_framework.permissions import IsAuthenticated
-from .models import Book
-from .serializers import BookSerializer
+from .filters import BookFilterBackend, BookOrderingFilter
+from .mixins import (
+    BulkModelMixin, ConditionalGetMixin, DeltaSyncMixin, RowSerializerMixin,
+    StreamingExportMixin,
+)
+from .models import Book, BookTombstone
+from .pagination import BookCursorPagination
+from .serializers import BookRowSerializer, BookSerializer
 
 # ListView for basic API endpoint - returns all books
-class BookList(generics.ListAPIView):
+class BookList(ConditionalGetMixin, RowSerializerMixin, generics.ListAPIView):
     """
-    API view to retrieve a list of all books.
+    API view to retrieve a list of all books, one cursor page at a time.
+    Rows are serialized through the BookRowSerializer fast path, and
+    unchanged results are answered with 304 Not Modified.
     Requires authentication to access.
     """
     queryset = Book.objects.all()
     serializer_class = BookSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = BookCursorPagination
+    row_serializer_class = BookRowSerializer
+    tombstone_model = BookTombstone
 
 # ViewSet for full CRUD operations
-class BookViewSet(viewsets.ModelViewSet):
+class BookViewSet(ConditionalGetMixin, RowSerializerMixin, BulkModelMixin,
+                  StreamingExportMixin, DeltaSyncMixin, viewsets.ModelViewSet):
     """
     A ViewSet that provides default `create()`, `retrieve()`, `update()`,
     `partial_update()`, `destroy()` and `list()` actions.
+    The list action is paginated with keyset cursors, and list/retrieve
+    are served by the BookRowSerializer fast path and support conditional
+    GET (ETag / Last-Modified).
+    Batches of books can be created, updated or deleted through `bulk/`,
+    the whole table can be streamed as NDJSON or CSV from `export/`, and
+    clients can sync incrementally from `changes/?since=<cursor>`.
+    Lists can be filtered and ordered with the index-backed parameters
+    described in api.filters.
     Requires authentication to access.
     """
     queryset = Book.objects.all()
     serializer_class = BookSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = BookCursorPagination
+    row_serializer_class = BookRowSerializer
+    tombstone_model = BookTombstone
+    export_filename = 'books'
+    filter_backends = [BookOrderingFilter, BookFilterBackend]
+    ordering_fields = ['created_at', 'updated_at', 'title']
+    ordering = ('created_at', 'id')
@@ -43,6 +43,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # First, so its timings cover the rest of the stack
+    'api_project.metrics.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -56,7 +58,8 @@ ROOT_URLCONF = 'api_project.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # Django's template backend, recording render times for api_project.metrics
+        'BACKEND': 'api_project.metrics.DjangoTemplates',
         'DIRS': [],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -69,6 +72,17 @@ TEMPLATES = [
     },
 ]
 
+# Per-view request metrics (api_project.metrics), served at /metrics/ to staff
+# users and to scrapers sending "Authorization: Bearer <TOKEN>" (an empty TOKEN
+# disables token access); Server-Timing headers show them per response.
+# ALLOWED_IPS grants access by REMOTE_ADDR. Leave it empty behind a reverse
+# proxy, where every request arrives from the proxy's address (e.g. 127.0.0.1)
+REQUEST_METRICS = {
+    'SERVER_TIMING': True,
+    'TOKEN': '',
+    'ALLOWED_IPS': (),
+}
+
 WSGI_APPLICATION = 'api_project.wsgi.application'
 
 
@@ -127,9 +141,54 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # Django REST Framework settings
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'api.authentication.CachedTokenAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
+    'DEFAULT_THROTTLE_CLASSES': [
+        'api.throttling.AnonTokenBucketThrottle',
+        'api.throttling.UserTokenBucketThrottle',
+    ],
+    'DEFAULT_THROTTLE_RATES': {
+        'anon': '60/min',
+        'user': '1000/min',
+        'auth_token': '10/min',
+    },
+    'DEFAULT_PAGINATION_CLASS': 'api.pagination.BookCursorPagination',
+    'PAGE_SIZE': 50,
+}
+
+# Upper bound for the `?page_size=` query parameter on paginated endpoints
+API_MAX_PAGE_SIZE = 500
+
+# Maximum number of items accepted by one request to a `bulk/` endpoint
+API_MAX_BATCH_SIZE = 1000
+
+# Rows fetched per database round-trip by streaming `export/` endpoints
+API_EXPORT_CHUNK_SIZE = 2000
+
+# Maximum number of changes returned by one `changes/` delta-sync request
+API_SYNC_PAGE_SIZE = 500
+
+# Seconds a change is held back from `changes/` so that transactions still
+# committing are not skipped; keep it above your longest write transaction
+API_SYNC_LAG = 5
+
+# Counter store for api.throttling token buckets. Use
+# 'api.throttling.CacheBucketStore' (OPTIONS: {'alias': ...}) for a Django cache, or
+# 'api.throttling.FileBucketStore' (OPTIONS: {'directory': ...}) to share counters
+# between worker processes on one host.
+API_THROTTLE_STORE = {
+    'BACKEND': 'api.throttling.MemoryBucketStore',
+    'OPTIONS': {},
+}
+
+# Token -> user lookup cache used by api.authentication.CachedTokenAuthentication.
+# Set SHARED_CACHE to a CACHES alias to share lookups between worker processes;
+# it also carries invalidations between them, so set it with more than one worker.
+API_TOKEN_CACHE = {
+    'MAX_ENTRIES': 10000,
+    'TTL': 300,  # seconds
+    'SHARED_CACHE': None,
 }
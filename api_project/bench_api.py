@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+Load-testing harness for the Django REST Framework API.
+
+Starts the project in-process on a threaded WSGI server backed by a
+throwaway SQLite database, seeds books, then drives concurrent clients
+across the list/retrieve/create/update/delete endpoints. Per-endpoint
+p50/p95/p99 latency, throughput and database query counts are written
+as JSON so runs can be compared for regressions:
+
+    python bench_api.py --books 5000 --clients 8 --requests 200 --output bench.json
+"""
+
+import argparse
+import json
+import math
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import defaultdict
+
+import django
+
+# Run against this project's settings
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_project.settings')
+
+# Share of requests sent to each endpoint
+WORKLOAD = {
+    'list': 40,
+    'retrieve': 30,
+    'create': 10,
+    'update': 10,
+    'delete': 10,
+}
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--books', type=int, default=1000, help='Books seeded before the run')
+    parser.add_argument('--clients', type=int, default=8, help='Concurrent client threads')
+    parser.add_argument('--requests', type=int, default=100, help='Requests sent by each client')
+    parser.add_argument('--page-size', type=int, default=50, help='page_size used for list requests')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed for the workload')
+    parser.add_argument('--throttle', action='store_true', help='Keep API throttling enabled')
+    parser.add_argument('--output', help='Write the JSON report here instead of stdout')
+    return parser.parse_args()
+
+
+def configure_django(database_path, throttle):
+    """Point the project at a throwaway database and start Django."""
+    from django.conf import settings
+
+    settings.DATABASES['default']['NAME'] = database_path
+    settings.ALLOWED_HOSTS = ['127.0.0.1', 'localhost']
+    # A load test from one user would otherwise mostly measure 429 responses
+    if not throttle:
+        settings.REST_FRAMEWORK['DEFAULT_THROTTLE_CLASSES'] = []
+    django.setup()
+
+    from django.core.management import call_command
+    call_command('migrate', verbosity=0, interactive=False)
+
+
+def seed(books):
+    """Create the benchmark user, token and books. Returns (token, book ids)."""
+    from django.contrib.auth.models import User
+    from rest_framework.authtoken.models import Token
+    from api.models import Book
+
+    user = User.objects.create_user(username='bench', password='bench-pass-123')
+    token = Token.objects.create(user=user)
+    Book.objects.bulk_create(
+        (Book(title=f'Benchmark Book {i}', author=f'Author {i % 200}') for i in range(books)),
+        batch_size=1000,
+    )
+    return token.key, list(Book.objects.values_list('id', flat=True))
+
+
+def counting_app(application):
+    """
+    Wrap the WSGI app so each response carries the number of database
+    queries it ran in an X-Query-Count header.
+    """
+    from django.db import connection
+
+    def app(environ, start_response):
+        queries = 0
+        captured = {}
+
+        def counter(execute, sql, params, many, context):
+            nonlocal queries
+            queries += 1
+            return execute(sql, params, many, context)
+
+        def capture(status, headers, exc_info=None):
+            captured['status'], captured['headers'] = status, headers
+
+        with connection.execute_wrapper(counter):
+            result = application(environ, capture)
+            try:
+                # Consume streaming responses while the wrapper is active
+                body = b''.join(result)
+            finally:
+                if hasattr(result, 'close'):
+                    result.close()
+        start_response(captured['status'], captured['headers'] + [('X-Query-Count', str(queries))])
+        return [body]
+
+    return app
+
+
+def start_server():
+    """Serve the project on an ephemeral port in a background thread."""
+    from django.core.handlers.wsgi import WSGIHandler
+    from django.core.servers.basehttp import ThreadedWSGIServer, WSGIRequestHandler
+
+    class QuietHandler(WSGIRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadedWSGIServer(('127.0.0.1', 0), QuietHandler, allow_reuse_address=True)
+    server.set_app(counting_app(WSGIHandler()))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://127.0.0.1:{server.server_port}/api'
+
+
+class Client:
+    """One benchmark client: a thread issuing a seeded random workload."""
+
+    def __init__(self, base_url, token, book_ids, args, index):
+        self.base_url = base_url
+        self.headers = {'Authorization': f'Token {token}', 'Content-Type': 'application/json'}
+        self.book_ids = book_ids
+        self.page_size = args.page_size
+        self.requests = args.requests
+        self.random = random.Random(args.seed * 1000 + index)
+        self.created = []
+        self.samples = []
+
+    def call(self, endpoint, method, path, payload=None):
+        data = json.dumps(payload).encode() if payload is not None else None
+        request = urllib.request.Request(
+            self.base_url + path, data=data, headers=self.headers, method=method
+        )
+        start = time.perf_counter()
+        try:
+            with urllib.request.urlopen(request) as response:
+                body = response.read()
+                status, queries = response.status, response.headers.get('X-Query-Count')
+        except urllib.error.HTTPError as exc:
+            body = exc.read()
+            status, queries = exc.code, exc.headers.get('X-Query-Count')
+        elapsed = time.perf_counter() - start
+        self.samples.append((endpoint, elapsed, status, int(queries or 0)))
+        return status, body
+
+    def run(self):
+        endpoints, weights = zip(*WORKLOAD.items())
+        for _ in range(self.requests):
+            endpoint = self.random.choices(endpoints, weights)[0]
+            if endpoint in ('update', 'delete') and not self.created:
+                endpoint = 'create'
+            getattr(self, endpoint)()
+
+    def list(self):
+        self.call('list', 'GET', f'/books_all/?page_size={self.page_size}')
+
+    def retrieve(self):
+        self.call('retrieve', 'GET', f'/books_all/{self.random.choice(self.book_ids)}/')
+
+    def create(self):
+        status, body = self.call('create', 'POST', '/books_all/', {
+            'title': f'Load Test {self.random.random():.8f}', 'author': 'Bench Client',
+        })
+        if status == 201:
+            self.created.append(json.loads(body)['id'])
+
+    def update(self):
+        book_id = self.random.choice(self.created)
+        self.call('update', 'PATCH', f'/books_all/{book_id}/', {'title': 'Load Test (updated)'})
+
+    def delete(self):
+        book_id = self.created.pop(self.random.randrange(len(self.created)))
+        self.call('delete', 'DELETE', f'/books_all/{book_id}/')
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize(samples, wall_time):
+    """Aggregate (endpoint, seconds, status, queries) samples into a report."""
+    grouped = defaultdict(list)
+    for sample in samples:
+        grouped[sample[0]].append(sample)
+    grouped['all'] = samples
+
+    report = {}
+    for endpoint, items in grouped.items():
+        latencies = sorted(item[1] * 1000 for item in items)
+        queries = [item[3] for item in items]
+        report[endpoint] = {
+            'requests': len(items),
+            'errors': sum(1 for item in items if item[2] >= 400),
+            'throughput_rps': round(len(items) / wall_time, 2),
+            'p50_ms': round(percentile(latencies, 50), 3),
+            'p95_ms': round(percentile(latencies, 95), 3),
+            'p99_ms': round(percentile(latencies, 99), 3),
+            'max_ms': round(latencies[-1], 3),
+            'avg_queries': round(sum(queries) / len(queries), 2),
+            'max_queries': max(queries),
+        }
+    return report
+
+
+def main():
+    args = parse_args()
+    with tempfile.TemporaryDirectory() as directory:
+        configure_django(os.path.join(directory, 'bench.sqlite3'), args.throttle)
+        token, book_ids = seed(args.books)
+        server, base_url = start_server()
+        try:
+            clients = [Client(base_url, token, book_ids, args, i) for i in range(args.clients)]
+            threads = [threading.Thread(target=client.run) for client in clients]
+            start = time.perf_counter()
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            wall_time = time.perf_counter() - start
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    samples = [sample for client in clients for sample in client.samples]
+    report = {
+        'config': {
+            'books': args.books,
+            'clients': args.clients,
+            'requests_per_client': args.requests,
+            'page_size': args.page_size,
+            'seed': args.seed,
+            'throttle': args.throttle,
+        },
+        'wall_time_s': round(wall_time, 3),
+        'endpoints': summarize(samples, wall_time),
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as handle:
+            handle.write(output + '\n')
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,292 @@
+"""
+Per-view request metrics.
+
+RequestMetricsMiddleware measures every request:
+- wall time
+- database queries and query time, via connection.execute_wrapper
+- template render time, via the DjangoTemplates backend below
+- response size
+
+It adds the numbers to in-process histograms labelled with the URL name of
+the view. Streaming responses run most of their queries while the body is
+sent, so for them the measurement continues until the last chunk and the
+response is recorded when it is closed. Every thread counts into its own set of buckets, so recording
+takes no lock; the sets are only summed when /metrics/ is scraped.
+
+The numbers are also sent back in a Server-Timing header (visible in the
+browser's network panel), and metrics_view serves them in the Prometheus
+text format to staff users and to scrapers that send
+REQUEST_METRICS['TOKEN'] as a bearer token. Each worker process keeps its
+own numbers, so scrape every process.
+"""
+import threading
+import time
+from bisect import bisect_left
+from contextlib import ExitStack
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+from django.http import HttpResponse, HttpResponseForbidden
+from django.template.backends import django as django_backend
+from django.template.exceptions import TemplateDoesNotExist
+from django.utils.crypto import constant_time_compare
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 200)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+# name -> (help text, buckets); None buckets make a counter
+METRICS = {
+    'django_http_requests_total': ('Requests by view, method and status code.', None),
+    'django_http_request_duration_seconds': ('Wall time per request.', DURATION_BUCKETS),
+    'django_http_db_queries': ('Database queries per request.', QUERY_BUCKETS),
+    'django_http_db_duration_seconds': ('Time spent in database queries per request.', DURATION_BUCKETS),
+    'django_http_template_duration_seconds': ('Template render time per request.', DURATION_BUCKETS),
+    'django_http_response_size_bytes': ('Response body size.', SIZE_BUCKETS),
+}
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def get_config():
+    # Behind a reverse proxy every request comes from the proxy's address,
+    # so no address is trusted unless one is configured
+    config = {'SERVER_TIMING': True, 'TOKEN': '', 'ALLOWED_IPS': ()}
+    config.update(getattr(settings, 'REQUEST_METRICS', {}))
+    return config
+
+
+class Histogram:
+    """
+    Bucketed observations, counted separately by every thread that
+    records one and summed on read. Buckets are upper bounds, as in
+    Prometheus; a buckets tuple of () gives a plain counter.
+    """
+
+    def __init__(self, buckets=()):
+        self.buckets = buckets
+        self._local = threading.local()
+        self._shards = []
+
+    def _shard(self):
+        shard = getattr(self._local, 'shard', None)
+        if shard is None:
+            # Bucket counts, then the +Inf bucket, then the sum
+            shard = self._local.shard = [0] * (len(self.buckets) + 2)
+            self._shards.append(shard)
+        return shard
+
+    def observe(self, value=1):
+        shard = self._shard()
+        shard[bisect_left(self.buckets, value)] += 1
+        shard[-1] += value
+
+    def snapshot(self):
+        """(cumulative bucket counts ending with +Inf, sum)."""
+        totals = [0] * (len(self.buckets) + 2)
+        for shard in list(self._shards):
+            for index, value in enumerate(shard):
+                totals[index] += value
+        cumulative, running = [], 0
+        for count in totals[:-1]:
+            running += count
+            cumulative.append(running)
+        return cumulative, totals[-1]
+
+
+# (metric name, label pairs) -> Histogram
+_series = {}
+
+
+def series(name, **labels):
+    key = (name, tuple(sorted(labels.items())))
+    histogram = _series.get(key)
+    if histogram is None:
+        # setdefault keeps whichever thread's Histogram got there first
+        histogram = _series.setdefault(key, Histogram(METRICS[name][1] or ()))
+    return histogram
+
+
+def reset():
+    _series.clear()
+
+
+class RequestStats:
+    """Database and template timings for one request; doubles as the execute wrapper."""
+
+    def __init__(self):
+        self.queries = 0
+        self.query_time = 0.0
+        self.template_time = 0.0
+        self.template_depth = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.query_time += time.perf_counter() - start
+
+    def server_timing(self, elapsed):
+        return (
+            f'app;dur={elapsed * 1000:.1f}, '
+            f'db;dur={self.query_time * 1000:.1f};desc="{self.queries} queries", '
+            f'tpl;dur={self.template_time * 1000:.1f}'
+        )
+
+
+_current = ContextVar('request_stats', default=None)
+
+
+class Template(django_backend.Template):
+    """Adds its render time to the current request's RequestStats."""
+
+    def render(self, context=None, request=None):
+        stats = _current.get()
+        if stats is None:
+            return super().render(context, request)
+        # Templates rendered while rendering another are already being timed
+        stats.template_depth += 1
+        start = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            stats.template_depth -= 1
+            if not stats.template_depth:
+                stats.template_time += time.perf_counter() - start
+
+
+class DjangoTemplates(django_backend.DjangoTemplates):
+    """The Django template backend, with render times recorded per request."""
+
+    def from_string(self, template_code):
+        return Template(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        try:
+            return Template(self.engine.get_template(template_name), self)
+        except TemplateDoesNotExist as exc:
+            django_backend.reraise(exc, self)
+
+
+def view_label(request):
+    match = getattr(request, 'resolver_match', None)
+    return match.view_name if match is not None else 'unresolved'
+
+
+class RequestMetricsMiddleware:
+    """Record per-view request metrics; put it first in MIDDLEWARE."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        stats = RequestStats()
+        start = time.perf_counter()
+        response = self.measure(stats, self.get_response, request)
+        elapsed = time.perf_counter() - start
+
+        if get_config()['SERVER_TIMING']:
+            # For streaming responses this covers only the time to the first byte
+            response['Server-Timing'] = stats.server_timing(elapsed)
+        if response.streaming and not response.is_async:
+            response.streaming_content = self.measure_stream(
+                response.streaming_content, request, response, stats, start
+            )
+        else:
+            size = None if response.streaming else len(response.content)
+            self.record(request, response, stats, elapsed, size)
+        return response
+
+    @staticmethod
+    def measure(stats, function, *args):
+        """Call `function` with its queries and template renders counted into `stats`."""
+        token = _current.set(stats)
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(stats))
+                return function(*args)
+        finally:
+            _current.reset(token)
+
+    def measure_stream(self, content, request, response, stats, start):
+        """
+        Yield the chunks of `content`, measuring the work done to produce
+        each, and record the request once the stream is exhausted or closed.
+        """
+        chunks = iter(content)
+        size = 0
+        try:
+            while True:
+                chunk = self.measure(stats, next, chunks, None)
+                if chunk is None:
+                    break
+                size += len(chunk)
+                yield chunk
+        finally:
+            self.record(request, response, stats, time.perf_counter() - start, size)
+
+    @staticmethod
+    def record(request, response, stats, elapsed, size):
+        view = view_label(request)
+        series('django_http_requests_total', view=view, method=request.method, status=response.status_code).observe()
+        series('django_http_request_duration_seconds', view=view).observe(elapsed)
+        series('django_http_db_queries', view=view).observe(stats.queries)
+        series('django_http_db_duration_seconds', view=view).observe(stats.query_time)
+        series('django_http_template_duration_seconds', view=view).observe(stats.template_time)
+        if size is not None:
+            series('django_http_response_size_bytes', view=view).observe(size)
+
+
+def _label_text(labels):
+    escaped = (
+        (name, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for name, value in labels
+    )
+    return ','.join(f'{name}="{value}"' for name, value in escaped)
+
+
+def render_metrics():
+    """All series in the Prometheus text exposition format."""
+    by_name = {}
+    for (name, labels), histogram in list(_series.items()):
+        by_name.setdefault(name, []).append((labels, histogram))
+
+    lines = []
+    for name, (help_text, buckets) in METRICS.items():
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} {"histogram" if buckets else "counter"}')
+        for labels, histogram in sorted(by_name.get(name, ()), key=lambda item: item[0]):
+            counts, total = histogram.snapshot()
+            label_text = _label_text(labels)
+            if not buckets:
+                lines.append(f'{name}{{{label_text}}} {counts[-1]}')
+                continue
+            for bound, count in zip(buckets + ('+Inf',), counts):
+                lines.append(f'{name}_bucket{{{label_text},le="{bound}"}} {count}')
+            lines.append(f'{name}_sum{{{label_text}}} {total}')
+            lines.append(f'{name}_count{{{label_text}}} {counts[-1]}')
+    return '\n'.join(lines) + '\n'
+
+
+def scrape_allowed(request):
+    """Staff users, the REQUEST_METRICS['TOKEN'] bearer token, or an ALLOWED_IPS address."""
+    config = get_config()
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_staff:
+        return True
+    if config['TOKEN'] and constant_time_compare(
+        request.headers.get('Authorization', ''), f"Bearer {config['TOKEN']}"
+    ):
+        return True
+    return request.META.get('REMOTE_ADDR') in config['ALLOWED_IPS']
+
+
+def metrics_view(request):
+    """Prometheus scrape endpoint; see scrape_allowed()."""
+    if not scrape_allowed(request):
+        return HttpResponseForbidden()
+    return HttpResponse(render_metrics(), content_type=CONTENT_TYPE)
@@ -0,0 +1,186 @@
+import csv
+import json
+import time
+from itertools import islice
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from relationship_app.models import Author, Book, Library
+
+# Columns (CSV header or JSONL keys) each kind of file must have
+COLUMNS = {
+    'authors': ('name',),
+    'books': ('title', 'author'),
+    'libraries': ('name',),
+    'memberships': ('library', 'title', 'author'),
+}
+
+
+def missing_columns(columns, present):
+    missing = [column for column in columns if column not in present]
+    return f"missing column{'s' if len(missing) > 1 else ''} {', '.join(missing)}" if missing else None
+
+
+def read_rows(path, columns=()):
+    """
+    Yield one dict per record of a .csv (header row) or .jsonl file,
+    reading the file lazily so large inputs never sit in memory at once.
+    A CSV header or JSONL record without all of `columns` is rejected.
+    """
+    if path.endswith('.jsonl'):
+        with open(path, encoding='utf-8') as handle:
+            for line_number, line in enumerate(handle, 1):
+                if line.strip():
+                    try:
+                        row = json.loads(line)
+                    except ValueError as exc:
+                        raise CommandError(f'{path}:{line_number}: invalid JSON ({exc})')
+                    if not isinstance(row, dict):
+                        raise CommandError(f'{path}:{line_number}: expected a JSON object')
+                    error = missing_columns(columns, row)
+                    if error:
+                        raise CommandError(f'{path}:{line_number}: {error}')
+                    yield row
+    elif path.endswith('.csv'):
+        with open(path, encoding='utf-8', newline='') as handle:
+            reader = csv.DictReader(handle)
+            error = missing_columns(columns, reader.fieldnames or ())
+            if error:
+                raise CommandError(f'{path}: {error}')
+            yield from reader
+    else:
+        raise CommandError(f'{path}: expected a .csv or .jsonl file')
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+class Command(BaseCommand):
+    """
+    Bulk-load authors, books, libraries and library memberships.
+
+    Each file is streamed in chunks of --batch-size rows and every chunk is
+    written in its own transaction with bulk inserts. Authors, books and
+    libraries are resolved through in-memory name -> id maps (preloaded from
+    the database), so existing rows are reused instead of duplicated and no
+    per-row lookups are made. Memberships go straight into the Library.books
+    through table with ignore_conflicts=True, relying on its unique
+    (library_id, book_id) constraint to skip pairs that already exist.
+
+    Progress is reported after every chunk: rows read, rows written (new
+    authors/books/libraries; membership pairs sent, duplicates included)
+    and rows/sec.
+
+    Expected columns (CSV header or JSONL keys):
+        authors:      name
+        books:        title, author
+        libraries:    name
+        memberships:  library, title, author
+    """
+    help = 'Bulk import authors, books, libraries and memberships from CSV/JSONL files'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--authors', help='CSV/JSONL file of authors')
+        parser.add_argument('--books', help='CSV/JSONL file of books')
+        parser.add_argument('--libraries', help='CSV/JSONL file of libraries')
+        parser.add_argument('--memberships', help='CSV/JSONL file of library memberships')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows per transaction')
+
+    def handle(self, *args, **options):
+        steps = [
+            (kind, options[kind], getattr(self, f'import_{kind}'))
+            for kind in ('authors', 'books', 'libraries', 'memberships')
+            if options[kind]
+        ]
+        if not steps:
+            raise CommandError('Nothing to import: pass at least one of --authors, --books, '
+                               '--libraries or --memberships')
+        self.batch_size = options['batch_size']
+
+        # name -> id, and (title, author id) -> id
+        self.authors = dict(Author.objects.values_list('name', 'id'))
+        self.libraries = dict(Library.objects.values_list('name', 'id'))
+        self.books = {
+            (title, author_id): pk
+            for pk, title, author_id in Book.objects.values_list('id', 'title', 'author_id')
+        }
+
+        total_rows, total_start = 0, time.perf_counter()
+        for kind, path, importer in steps:
+            rows, written, start = 0, 0, time.perf_counter()
+            for chunk in chunked(read_rows(path, COLUMNS[kind]), self.batch_size):
+                with transaction.atomic():
+                    written += importer(chunk)
+                rows += len(chunk)
+                self.report(kind, rows, written, start)
+            total_rows += rows
+
+        elapsed = time.perf_counter() - total_start
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported {total_rows:,} rows in {elapsed:.2f}s '
+            f'({total_rows / elapsed if elapsed else 0:,.0f} rows/sec)'
+        ))
+
+    def report(self, kind, rows, written, start):
+        elapsed = time.perf_counter() - start
+        rate = rows / elapsed if elapsed else 0
+        self.stdout.write(f'{kind:<12} {rows:>10,} rows  {written:>10,} written  {rate:>10,.0f} rows/sec')
+
+    def create_missing(self, model, objects, key, lookup):
+        """
+        bulk_create objects whose key is not in the lookup map yet and record
+        their ids. Returns how many were created.
+        """
+        pending = {}
+        for obj in objects:
+            pending.setdefault(key(obj), obj)
+        for name in list(pending):
+            if name in lookup:
+                del pending[name]
+        model.objects.bulk_create(pending.values(), batch_size=self.batch_size)
+        if pending and next(iter(pending.values())).pk is None:
+            raise CommandError('This database backend does not return ids from bulk inserts')
+        for name, obj in pending.items():
+            lookup[name] = obj.pk
+        return len(pending)
+
+    def import_authors(self, chunk):
+        return self.create_missing(
+            Author, (Author(name=row['name']) for row in chunk), lambda obj: obj.name, self.authors,
+        )
+
+    def import_books(self, chunk):
+        # Authors named only by a book are created first, in one batch
+        self.create_missing(
+            Author, (Author(name=row['author']) for row in chunk), lambda obj: obj.name, self.authors,
+        )
+        return self.create_missing(
+            Book,
+            (Book(title=row['title'], author_id=self.authors[row['author']]) for row in chunk),
+            lambda obj: (obj.title, obj.author_id),
+            self.books,
+        )
+
+    def import_libraries(self, chunk):
+        return self.create_missing(
+            Library, (Library(name=row['name']) for row in chunk), lambda obj: obj.name, self.libraries,
+        )
+
+    def import_memberships(self, chunk):
+        Membership = Library.books.through
+        memberships = []
+        for row in chunk:
+            library_id = self.libraries.get(row['library'])
+            book_id = self.books.get((row['title'], self.authors.get(row['author'])))
+            if library_id is None or book_id is None:
+                raise CommandError(
+                    f"Unknown library or book in membership: {row['library']!r} / "
+                    f"{row['title']!r} by {row['author']!r}"
+                )
+            memberships.append(Membership(library_id=library_id, book_id=book_id))
+        Membership.objects.bulk_create(memberships, batch_size=self.batch_size, ignore_conflicts=True)
+        return len(memberships)
@@ -0,0 +1,109 @@
+import re
+import sys
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+# A django.db.backends debug record: "(0.002) SELECT ...; args=(...); alias=default"
+LOG_LINE_RE = re.compile(r'\((?P<duration>\d+\.\d+)\) (?P<sql>.+); args=.*; alias=(?P<alias>\S+)$')
+
+# Literals folded out of statements so repeats of one lookup are grouped
+LITERAL_RE = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+IN_LIST_RE = re.compile(r'IN \((?:\?, )*\?\)')
+
+# EXPLAIN QUERY PLAN details that mean rows are read without an index
+SCAN_RE = re.compile(r'^SCAN (?P<table>\S+)(?P<rest>.*)$')
+
+
+def normalize(sql):
+    return IN_LIST_RE.sub('IN (...)', LITERAL_RE.sub('?', sql))
+
+
+def unindexed_steps(plan, ignored_tables=()):
+    """The steps of an EXPLAIN QUERY PLAN that scan a table or sort without an index."""
+    steps = []
+    for row in plan:
+        detail = row[-1]
+        match = SCAN_RE.match(detail)
+        if match:
+            if 'INDEX' in match['rest'] or 'VIRTUAL TABLE' in match['rest']:
+                continue
+            if match['table'] == 'CONSTANT' or match['table'] in ignored_tables:
+                continue
+            steps.append(detail)
+        elif detail.startswith('USE TEMP B-TREE'):
+            steps.append(detail)
+    return steps
+
+
+class Command(BaseCommand):
+    """
+    Read a django.db.backends query log, run EXPLAIN QUERY PLAN on one
+    example of each distinct lookup, and list those that scan a whole table
+    or sort without an index, costliest first.
+
+    Statements are only logged with DEBUG = True, by a handler on the
+    'django.db.backends' logger at DEBUG level (see DJANGO_TASKS_README.md).
+    Only SQLite is supported, and the database must have the schema the
+    logged statements ran against.
+    """
+    help = 'Report un-indexed lookups in a query log, checked with EXPLAIN QUERY PLAN'
+
+    def add_arguments(self, parser):
+        parser.add_argument('logs', nargs='+', help="Query log files, or '-' for standard input")
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS, help='Database to explain the queries on')
+        parser.add_argument('--min-calls', type=int, default=1, help='Ignore lookups logged fewer times')
+        parser.add_argument(
+            '--ignore-table', action='append', default=[],
+            help='Do not report scans of this table (e.g. small lookup tables); repeatable',
+        )
+
+    def handle(self, *args, **options):
+        connection = connections[options['database']]
+        if connection.vendor != 'sqlite':
+            raise CommandError('EXPLAIN QUERY PLAN reports need an SQLite database')
+
+        # normalized statement -> [calls, total seconds, example statement]
+        lookups = defaultdict(lambda: [0, 0.0, None])
+        for path in options['logs']:
+            stream = sys.stdin if path == '-' else open(path, encoding='utf-8')
+            try:
+                for line in stream:
+                    match = LOG_LINE_RE.search(line.strip())
+                    if not match or match['alias'] != options['database']:
+                        continue
+                    if not match['sql'].lstrip().upper().startswith(('SELECT', 'UPDATE', 'DELETE')):
+                        continue
+                    lookup = lookups[normalize(match['sql'])]
+                    lookup[0] += 1
+                    lookup[1] += float(match['duration'])
+                    lookup[2] = lookup[2] or match['sql']
+            finally:
+                if stream is not sys.stdin:
+                    stream.close()
+
+        ignored = set(options['ignore_table'])
+        findings, failed = [], 0
+        with connection.cursor() as cursor:
+            for statement, (calls, seconds, example) in lookups.items():
+                if calls < options['min_calls']:
+                    continue
+                try:
+                    cursor.execute(f'EXPLAIN QUERY PLAN {example}')
+                    plan = cursor.fetchall()
+                except DatabaseError:
+                    failed += 1
+                    continue
+                steps = unindexed_steps(plan, ignored)
+                if steps:
+                    findings.append((seconds, calls, steps, statement))
+
+        findings.sort(reverse=True)
+        self.stdout.write(f'{len(lookups)} distinct lookups, {len(findings)} without an index')
+        for seconds, calls, steps, statement in findings:
+            self.stdout.write(f'\n{calls:>6} calls {seconds * 1000:>10.1f} ms  {statement}')
+            for step in steps:
+                self.stdout.write(f'{"":>26}{step}')
+        if failed:
+            self.stderr.write(f'{failed} lookups could not be explained on this database')
@@ -0,0 +1,62 @@
+"""
+Batch lookups over the Author/Book/Library/Librarian graph.
+
+Each function takes any number of names and answers them with a fixed
+number of queries per batch of BATCH_SIZE names (IN lookups plus
+prefetching), instead of a few queries per name. Results are returned as
+dicts keyed by the requested name; names that match nothing are left out.
+"""
+from django.db.models import Prefetch
+
+from .models import Author, Book, Library
+
+# Names per IN (...) lookup, kept below SQLite's historic 999-variable limit
+BATCH_SIZE = 900
+
+
+def _batches(names):
+    names = list(dict.fromkeys(names))
+    for start in range(0, len(names), BATCH_SIZE):
+        yield names[start:start + BATCH_SIZE]
+
+
+def books_by_authors(author_names):
+    """
+    Map each author name to the list of that author's books.
+    Two queries per batch: the authors, then all of their books.
+    """
+    results = {}
+    for batch in _batches(author_names):
+        authors = Author.objects.filter(name__in=batch).prefetch_related(
+            Prefetch('book_set', queryset=Book.objects.order_by('pk'))
+        )
+        for author in authors:
+            results.setdefault(author.name, []).extend(author.book_set.all())
+    return results
+
+
+def books_in_libraries(library_names):
+    """
+    Map each library name to its books, with each book's author loaded.
+    Two queries per batch: the libraries, then their books joined with authors.
+    """
+    results = {}
+    for batch in _batches(library_names):
+        libraries = Library.objects.filter(name__in=batch).prefetch_related(
+            Prefetch('books', queryset=Book.objects.select_related('author').order_by('pk'))
+        )
+        for library in libraries:
+            results.setdefault(library.name, []).extend(library.books.all())
+    return results
+
+
+def librarians_for_libraries(library_names):
+    """
+    Map each library name to its Librarian, or None if it has none.
+    One query per batch: the libraries joined with their librarians.
+    """
+    results = {}
+    for batch in _batches(library_names):
+        for library in Library.objects.filter(name__in=batch).select_related('librarian'):
+            results.setdefault(library.name, getattr(library, 'librarian', None))
+    return results
@@ -1,3 +1,385 @@
-from django.test import TestCase
+import json
+import os
+import re
+import tempfile
+import threading
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.db import IntegrityError, connection, transaction
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from LibraryProject import metrics
+
+from . import queries
+from .models import Author, Book, Librarian, Library, UserProfile
+from .views import LibraryDetailView
+
+
+class QueryBudgetTests(TestCase):
+    """
+    Query-count budgets for the book listing views. Each budget is fixed,
+    so an N+1 regression (one query per book) fails the test.
+    """
+    @classmethod
+    def setUpTestData(cls):
+        authors = [Author.objects.create(name=f'Author {i}') for i in range(5)]
+        books = Book.objects.bulk_create(
+            Book(title=f'Book {i}', author=authors[i % 5]) for i in range(20)
+        )
+        cls.library = Library.objects.create(name='Central Library')
+        cls.library.books.set(books)
+
+    def test_list_books_query_budget(self):
+        # One query for the books joined with their authors
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('list_books'))
+        self.assertContains(response, 'Book 19 by Author 4')
+
+    def test_library_detail_query_budget(self):
+        # One query for the library, one for its books joined with authors
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('library_detail', args=[self.library.pk]))
+        self.assertContains(response, 'Book 19 by Author 4')
+
+
+class LibraryDetailPaginationTests(TestCase):
+    """Keyset pages and the streamed full listing of library_detail."""
+    @classmethod
+    def setUpTestData(cls):
+        author = Author.objects.create(name='Prolific')
+        cls.books = Book.objects.bulk_create(
+            Book(title=f'Volume {i:03}', author=author) for i in range(120)
+        )
+        cls.library = Library.objects.create(name='Big Library')
+        cls.library.books.set(cls.books)
+        cls.url = reverse('library_detail', args=[cls.library.pk])
+
+    def test_pages_follow_the_cursor(self):
+        response = self.client.get(self.url)
+        self.assertEqual(len(response.context['books']), 50)
+        self.assertEqual(response.context['next_after'], self.books[49].pk)
+        self.assertContains(response, f'?after={self.books[49].pk}')
+
+        response = self.client.get(self.url, {'after': self.books[99].pk})
+        self.assertEqual([book.title for book in response.context['books']],
+                         [f'Volume {i:03}' for i in range(100, 120)])
+        self.assertIsNone(response.context['next_after'])
+        self.assertNotContains(response, 'Next page')
+
+    def test_page_query_budget_is_flat(self):
+        with self.assertNumQueries(2):
+            self.client.get(self.url, {'after': self.books[59].pk})
+
+    def test_stream_all_books(self):
+        response = self.client.get(self.url, {'all': '1'})
+        self.assertTrue(response.streaming)
+        body = b''.join(response.streaming_content).decode()
+        self.assertEqual(body.count('<li>'), 120)
+        self.assertIn('Volume 119 by Prolific', body)
+
+    def test_stream_uses_the_page_markup(self):
+        page = self.client.get(self.url, {'after': self.books[-1].pk}).content.decode()
+        response = self.client.get(self.url, {'all': '1'})
+        body = b''.join(response.streaming_content).decode()
+        head = page[page.index('<!DOCTYPE html>'):page.index('<ul>') + len('<ul>')]
+        self.assertTrue(body.startswith(head))
+        self.assertTrue(body.rstrip().endswith('</html>'))
+        self.assertNotIn('Show all books', body)
+
+
+class ImportLibraryGraphTests(TestCase):
+    """The import_library_graph bulk loader."""
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def write(self, name, content):
+        path = os.path.join(self.directory.name, name)
+        with open(path, 'w', encoding='utf-8') as handle:
+            handle.write(content)
+        return path
+
+    def run_import(self, **files):
+        output = StringIO()
+        call_command('import_library_graph', batch_size=2, stdout=output, **files)
+        return output.getvalue()
+
+    def test_imports_graph_in_batches(self):
+        Author.objects.create(name='Existing Author')
+        files = {
+            'authors': self.write('authors.csv', 'name\nExisting Author\nNew Author\n'),
+            'books': self.write('books.jsonl', '\n'.join(json.dumps(row) for row in [
+                {'title': 'First', 'author': 'Existing Author'},
+                {'title': 'Second', 'author': 'New Author'},
+                {'title': 'Third', 'author': 'Book-only Author'},
+            ])),
+            'libraries': self.write('libraries.csv', 'name\nCentral\n'),
+            'memberships': self.write(
+                'memberships.csv',
+                'library,title,author\nCentral,First,Existing Author\nCentral,Third,Book-only Author\n',
+            ),
+        }
+        output = self.run_import(**files)
+
+        self.assertEqual(Author.objects.count(), 3)
+        self.assertEqual(Book.objects.get(title='Third').author.name, 'Book-only Author')
+        library = Library.objects.get(name='Central')
+        self.assertEqual(sorted(library.books.values_list('title', flat=True)), ['First', 'Third'])
+        self.assertIn('rows/sec', output)
+
+        # Re-running the same files reuses every row instead of duplicating it
+        self.run_import(**files)
+        self.assertEqual(Author.objects.count(), 3)
+        self.assertEqual(Book.objects.count(), 3)
+        self.assertEqual(Library.objects.count(), 1)
+        self.assertEqual(library.books.count(), 2)
+
+    def test_missing_columns_are_reported(self):
+        path = self.write('books.csv', 'name\nDune\n')
+        with self.assertRaisesMessage(CommandError, 'missing columns title, author'):
+            self.run_import(books=path)
+        path = self.write('books.jsonl', '{"title": "Dune"}\n')
+        with self.assertRaisesMessage(CommandError, 'books.jsonl:1: missing column author'):
+            self.run_import(books=path)
+        self.assertFalse(Book.objects.exists())
+
+    def test_unknown_membership_is_rejected(self):
+        path = self.write('memberships.csv', 'library,title,author\nNowhere,Missing,Nobody\n')
+        with self.assertRaises(CommandError):
+            self.run_import(memberships=path)
+
+
+class BatchQueryTests(TestCase):
+    """relationship_app.queries answers many names in a fixed number of queries."""
+    @classmethod
+    def setUpTestData(cls):
+        authors = [Author.objects.create(name=f'Author {i}') for i in range(10)]
+        books = Book.objects.bulk_create(
+            Book(title=f'Book {i}', author=authors[i % 10]) for i in range(50)
+        )
+        cls.libraries = [Library.objects.create(name=f'Library {i}') for i in range(10)]
+        for i, library in enumerate(cls.libraries):
+            library.books.set(books[i::10])
+            if i % 2 == 0:
+                Librarian.objects.create(name=f'Librarian {i}', library=library)
+
+    def test_books_by_authors(self):
+        names = [f'Author {i}' for i in range(10)] + ['Nobody']
+        with self.assertNumQueries(2):
+            result = queries.books_by_authors(names)
+        self.assertNotIn('Nobody', result)
+        self.assertEqual([book.title for book in result['Author 3']],
+                         ['Book 3', 'Book 13', 'Book 23', 'Book 33', 'Book 43'])
+
+    def test_books_in_libraries_loads_authors(self):
+        with self.assertNumQueries(2):
+            result = queries.books_in_libraries([f'Library {i}' for i in range(10)])
+            listing = [f'{book.title} by {book.author.name}' for book in result['Library 4']]
+        self.assertEqual(listing[0], 'Book 4 by Author 4')
+        self.assertEqual(len(listing), 5)
+
+    def test_librarians_for_libraries(self):
+        with self.assertNumQueries(1):
+            result = queries.librarians_for_libraries(['Library 0', 'Library 1', 'Missing'])
+        self.assertEqual(result['Library 0'].name, 'Librarian 0')
+        self.assertIsNone(result['Library 1'])
+        self.assertNotIn('Missing', result)
+
+    def test_names_are_batched(self):
+        names = [f'Author {i}' for i in range(10)]
+        with mock.patch.object(queries, 'BATCH_SIZE', 2), self.assertNumQueries(10):
+            result = queries.books_by_authors(names)
+        self.assertEqual(len(result), 10)
+
+
+class RoleViewTests(TestCase):
+    """Role checks read the profile loaded with request.user."""
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(
+            username='librarian', email='librarian@example.com', password='pass-12345'
+        )
+        cls.user.userprofile.role = 'Librarian'
+        cls.user.userprofile.save()
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def test_matching_role_is_let_through(self):
+        # The profile comes joined to the user; it is never queried on its own
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get(reverse('librarian_view'))
+        self.assertEqual(response.status_code, 200)
+        profile_queries = [
+            query['sql'] for query in captured.captured_queries
+            if 'FROM "relationship_app_userprofile"' in query['sql']
+        ]
+        self.assertEqual(profile_queries, [])
+
+    def test_other_roles_are_redirected(self):
+        for name in ('admin_view', 'member_view'):
+            response = self.client.get(reverse(name))
+            self.assertEqual(response.status_code, 302)
+
+    def test_anonymous_users_are_redirected(self):
+        self.client.logout()
+        self.assertEqual(self.client.get(reverse('librarian_view')).status_code, 302)
+
+
+class UserProfileWriteTests(TestCase):
+    """UserProfile is only written when one of its fields changed."""
+    def setUp(self):
+        User = get_user_model()
+        User.objects.create_user(username='reader', email='reader@example.com', password='pass-12345')
+        self.user = User.objects.get(username='reader')
+
+    def test_user_save_does_not_touch_profile(self):
+        with self.assertNumQueries(1):
+            self.user.save(update_fields=['last_login'])
+
+    def test_unchanged_profile_is_not_saved(self):
+        profile = self.user.userprofile
+        with self.assertNumQueries(0):
+            profile.save()
+
+    def test_changed_profile_is_saved_with_user(self):
+        self.user.userprofile.role = 'Admin'
+        self.user.save()
+        self.assertEqual(UserProfile.objects.get(user=self.user).role, 'Admin')
+        self.assertEqual(self.user.userprofile.changed_fields(), [])
+
+    def test_changed_user_is_saved(self):
+        other = get_user_model().objects.bulk_create(
+            [get_user_model()(username='other', email='other@example.com')]
+        )[0]
+        profile = UserProfile.objects.get(user=self.user)
+        profile.user = other
+        profile.save()
+        self.assertEqual(UserProfile.objects.get(pk=profile.pk).user_id, other.pk)
+
+    def test_refresh_from_db_takes_new_snapshot(self):
+        profile = UserProfile.objects.get(user=self.user)
+        UserProfile.objects.filter(pk=profile.pk).update(role='Librarian')
+        profile.refresh_from_db()
+        self.assertEqual(profile.changed_fields(), [])
+        profile.role = 'Member'
+        profile.save()
+        self.assertEqual(UserProfile.objects.get(pk=profile.pk).role, 'Member')
+
+    def test_create_for_bulk_created_users(self):
+        User = get_user_model()
+        users = User.objects.bulk_create(
+            User(username=f'bulk-{i}', email=f'bulk-{i}@example.com') for i in range(5)
+        )
+        with self.assertNumQueries(1):
+            UserProfile.objects.create_for_users(users, role='Librarian')
+        # Users that already have a profile are skipped
+        UserProfile.objects.create_for_users(users + [self.user])
+        self.assertEqual(UserProfile.objects.filter(role='Librarian').count(), 5)
+        self.assertEqual(UserProfile.objects.count(), 6)
+
+
+class IndexTests(TestCase):
+    """
+    Tests for the name constraints and the un-indexed lookup report.
+    """
+    def test_names_are_unique(self):
+        author = Author.objects.create(name='Unique Author')
+        Book.objects.create(title='Only Once', author=author)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Author.objects.create(name='Unique Author')
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Book.objects.create(title='Only Once', author=author)
+        Library.objects.create(name='Unique Library')
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Library.objects.create(name='Unique Library')
+
+    def test_report_lists_scans_from_query_log(self):
+        library = Library.objects.create(name='Logged Library')
+        with CaptureQueriesContext(connection) as captured:
+            Author.objects.filter(name='Someone').first()
+            Author.objects.filter(name='Someone Else').first()
+            list(Book.objects.filter(title='Something'))
+            list(Librarian.objects.filter(name='Nobody'))
+            list(Librarian.objects.filter(library=library))
+        with tempfile.NamedTemporaryFile('w', suffix='.log', delete=False) as log:
+            for query in captured.captured_queries:
+                log.write(f"({query['time']}) {query['sql']}; args=(); alias=default\n")
+            log.write('(0.001) SAVEPOINT "s1"; args=None; alias=default\n')
+        self.addCleanup(os.remove, log.name)
+
+        out = StringIO()
+        call_command('report_unindexed_lookups', log.name, stdout=out)
+        report = out.getvalue()
+        self.assertIn('4 distinct lookups, 1 without an index', report)
+        self.assertIn('SCAN relationship_app_librarian', report)
+        self.assertIn('"relationship_app_librarian"."name" = ?', report)
+
+
+@override_settings(REQUEST_METRICS={'TOKEN': 'scrape-token'})
+class RequestMetricsTests(TestCase):
+    """
+    Tests for the per-view request metrics middleware and endpoint.
+    """
+    def setUp(self):
+        metrics.reset()
+
+    def scrape(self):
+        response = self.client.get(reverse('metrics'), HTTP_AUTHORIZATION='Bearer scrape-token')
+        self.assertEqual(response.status_code, 200)
+        return response.content.decode()
+
+    def test_request_is_measured(self):
+        author = Author.objects.create(name='Measured Author')
+        Book.objects.create(title='Measured Book', author=author)
+        response = self.client.get(reverse('list_books'))
+        self.assertRegex(response['Server-Timing'], r'^app;dur=[\d.]+, db;dur=[\d.]+;desc="\d+ queries", tpl;dur=[\d.]+$')
+
+        text = self.scrape()
+        self.assertIn('django_http_requests_total{method="GET",status="200",view="list_books"} 1', text)
+        self.assertIn('django_http_request_duration_seconds_bucket{view="list_books",le="+Inf"} 1', text)
+        self.assertIn('django_http_db_queries_count{view="list_books"} 1', text)
+        self.assertIn(f'django_http_response_size_bytes_sum{{view="list_books"}} {len(response.content)}', text)
+        template_time = float(re.search(r'django_http_template_duration_seconds_sum\{view="list_books"\} (\S+)', text)[1])
+        self.assertGreater(template_time, 0)
+
+    def test_streaming_response_is_measured_to_the_end(self):
+        author = Author.objects.create(name='Streamed Author')
+        library = Library.objects.create(name='Streamed Library')
+        library.books.set(Book.objects.create(title=f'Streamed {i}', author=author) for i in range(3))
+        url = reverse('library_detail', args=[library.pk])
+        with mock.patch.object(LibraryDetailView, 'stream_chunk_size', 2):
+            response = self.client.get(url, {'all': '1'})
+            body = b''.join(response.streaming_content)
+
+        text = self.scrape()
+        # The library, then the memberships read while streaming
+        self.assertIn('django_http_db_queries_sum{view="library_detail"} 2', text)
+        self.assertIn(f'django_http_response_size_bytes_sum{{view="library_detail"}} {len(body)}', text)
+
+    def test_histogram_counts_every_thread(self):
+        histogram = metrics.Histogram((1, 10))
+        threads = [threading.Thread(target=lambda: [histogram.observe(v) for v in (0.5, 5, 50)]) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(histogram.snapshot(), ([4, 8, 12], 222.0))
+
+    def test_endpoint_is_restricted(self):
+        url = reverse('metrics')
+        # Loopback is not trusted by default: behind a proxy every client has it
+        self.assertEqual(self.client.get(url, REMOTE_ADDR='127.0.0.1').status_code, 403)
+        self.assertEqual(self.client.get(url, HTTP_AUTHORIZATION='Bearer wrong').status_code, 403)
+        with override_settings(REQUEST_METRICS={'ALLOWED_IPS': ('10.0.0.5',)}):
+            self.assertEqual(self.client.get(url, REMOTE_ADDR='10.0.0.5').status_code, 200)
+        staff = get_user_model().objects.create_user(
+            username='operator', email='operator@example.com', password='pass-12345', is_staff=True
+        )
+        self.client.force_login(staff)
+        self.assertEqual(self.client.get(url).status_code, 200)
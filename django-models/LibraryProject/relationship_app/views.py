@@ -1,61 +1,97 @@
+from itertools import islice
+
 from django.shortcuts import render, redirect
-from django.views.generic import ListView
 from django.views.generic.detail import DetailView
-from django.http import HttpResponse
+from django.http import HttpResponse, StreamingHttpResponse
 from django.contrib.auth import login, logout
 from django.contrib.auth.forms import UserCreationForm
 from django.contrib.auth.views import LoginView, LogoutView
 from django.contrib import messages
-from django.contrib.auth.decorators import user_passes_test
+from django.template.loader import get_template
 from django.contrib.auth.decorators import permission_required
+from django.db import IntegrityError, transaction
 from django.utils.decorators import method_decorator
 from .models import Book, Author
 from .models import Library
+from .roles import role_required
 
 # Function-based view to list all books
 def list_books(request):
-    books = Book.objects.all()
+    # The template shows book.author.name, so join authors in the same query
+    books = Book.objects.select_related('author')
     return render(request, 'relationship_app/list_books.html', {'books': books})
 
 # Class-based view to display library details
-class LibraryDetailView(ListView):
+class LibraryDetailView(DetailView):
+    """
+    Show one library and its books, one page at a time.
+
+    Books are paged with a keyset cursor on the Library.books through table
+    (`?after=<last book id>`), which the (library_id, book_id) unique index
+    answers directly however large the collection is. `?all=1` streams the
+    complete listing in chunks instead of building it in memory.
+    """
     model = Library
     template_name = 'relationship_app/library_detail.html'
     context_object_name = 'library'
-    
-    def get_queryset(self):
-        # Get a specific library or the first one if no pk is provided
-        if 'pk' in self.kwargs:
-            return Library.objects.filter(pk=self.kwargs['pk'])
-        return Library.objects.all()[:1]
-    
+    paginate_by = 50
+    stream_chunk_size = 2000
+
+    def get(self, request, *args, **kwargs):
+        self.object = self.get_object()
+        if request.GET.get('all'):
+            return StreamingHttpResponse(self.stream_books(), content_type='text/html; charset=utf-8')
+        return self.render_to_response(self.get_context_data(object=self.object))
+
+    def get_memberships(self):
+        """Library.books rows for this library, ordered by book id, with authors joined."""
+        return (
+            Library.books.through.objects
+            .filter(library_id=self.object.pk)
+            .select_related('book__author')
+            .order_by('book_id')
+        )
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        if context['library']:
-            context['library'] = context['library'][0]
+        memberships = self.get_memberships()
+        after = self.request.GET.get('after')
+        if after and after.isdigit():
+            memberships = memberships.filter(book_id__gt=int(after))
+        page = list(memberships[:self.paginate_by + 1])
+        books = [membership.book for membership in page[:self.paginate_by]]
+        context['books'] = books
+        context['next_after'] = books[-1].pk if len(page) > self.paginate_by else None
         return context
 
-# Role-based views
+    def stream_books(self):
+        # The page's own head, row and tail templates, with the rows rendered
+        # once per chunk
+        head = get_template('relationship_app/library_detail_head.html')
+        rows = get_template('relationship_app/library_book_rows.html')
+        tail = get_template('relationship_app/library_detail_tail.html')
+        yield head.render({'library': self.object}, self.request)
+        memberships = self.get_memberships().iterator(chunk_size=self.stream_chunk_size)
+        while chunk := list(islice(memberships, self.stream_chunk_size)):
+            yield rows.render({'books': [membership.book for membership in chunk]}, self.request)
+        yield tail.render({'streaming': True}, self.request)
 
-# A decorator to check if the user has a specific role
-
-def role_required(role):
-    def has_role(user):
-        return hasattr(user, 'userprofile') and user.userprofile.role == role
-    return user_passes_test(has_role)
+# Role-based views
+# Role checks come from relationship_app.roles and cost no queries once the
+# profile is loaded with the user (see relationship_app.backends)
 
 # Views for Admin
-@user_passes_test(lambda u: hasattr(u, 'userprofile') and u.userprofile.role == 'Admin')
+@role_required('Admin')
 def admin_view(request):
     return render(request, 'relationship_app/admin_view.html')
 
 # Views for Librarian
-@user_passes_test(lambda u: hasattr(u, 'userprofile') and u.userprofile.role == 'Librarian')
+@role_required('Librarian')
 def librarian_view(request):
     return render(request, 'relationship_app/librarian_view.html')
 
 # Views for Member
-@user_passes_test(lambda u: hasattr(u, 'userprofile') and u.userprofile.role == 'Member')
+@role_required('Member')
 def member_view(request):
     return render(request, 'relationship_app/member_view.html')
 
@@ -87,7 +123,12 @@ def add_book_view(request):
         author_name = request.POST.get('author')
         if title and author_name:
             author, created = Author.objects.get_or_create(name=author_name)
-            book = Book.objects.create(title=title, author=author)
+            try:
+                with transaction.atomic():
+                    book = Book.objects.create(title=title, author=author)
+            except IntegrityError:
+                messages.error(request, f'"{title}" by {author_name} already exists.')
+                return render(request, 'relationship_app/add_book.html')
             messages.success(request, f'Book "{title}" added successfully!')
             return redirect('list_books')
         else:
@@ -109,7 +150,12 @@ def edit_book_view(request, book_id):
             author, created = Author.objects.get_or_create(name=author_name)
             book.title = title
             book.author = author
-            book.save()
+            try:
+                with transaction.atomic():
+                    book.save()
+            except IntegrityError:
+                messages.error(request, f'"{title}" by {author_name} already exists.')
+                return render(request, 'relationship_app/edit_book.html', {'book': book})
             messages.success(request, f'Book "{title}" updated successfully!')
             return redirect('list_books')
         else: